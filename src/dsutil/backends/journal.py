@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+JOURNAL_UNITS = ("ds-*", "nginx.service")
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    ts: datetime
+    unit: str
+    message: str
+    cursor: str
+
+
+@dataclass(frozen=True)
+class JournalRead:
+    entries: list[JournalEntry]
+    cursor: str | None
+    rc: int
+    err: str
+
+
+def _message(v: object) -> str:
+    # journald exports non-UTF-8 / binary messages as a list of byte values
+    if isinstance(v, list):
+        return bytes(b for b in v if isinstance(b, int)).decode("utf-8", errors="replace")
+    return "" if v is None else str(v)
+
+
+def parse_entry(line: str) -> JournalEntry | None:
+    try:
+        d = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(d, dict) or "__CURSOR" not in d:
+        return None
+    usec = d.get("__REALTIME_TIMESTAMP") or "0"
+    ts = datetime.fromtimestamp(int(usec) / 1e6, tz=timezone.utc)
+    unit = str(d.get("_SYSTEMD_UNIT") or d.get("SYSLOG_IDENTIFIER") or "")
+    return JournalEntry(ts, unit, _message(d.get("MESSAGE")), str(d["__CURSOR"]))
+
+
+def read_journal(
+    units: Iterable[str] = JOURNAL_UNITS,
+    cursor: str | None = None,
+    limit: int = 400,
+    journalctl: str = "journalctl",
+    timeout_s: int = 20,
+) -> JournalRead:
+    """Stream `journalctl -o json` for the given units.
+
+    Without a cursor only the last `limit` entries are read; with one, every entry
+    after it is streamed and the newest `limit` kept. The returned cursor is that
+    of the last entry seen, so the next run resumes right after it.
+    """
+    cmd = [journalctl, "-o", "json", "--no-pager", "-q"]
+    for u in units:
+        cmd += ["-u", u]
+    cmd += ["--after-cursor", cursor] if cursor else ["-n", str(int(limit))]
+
+    # stderr goes to a file: warnings (e.g. corrupted journal files) can exceed a pipe
+    # buffer and would block journalctl while stdout is still being read
+    with tempfile.TemporaryFile() as errf:
+        try:
+            p = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=errf,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except OSError as e:
+            return JournalRead([], cursor, 127, str(e))
+
+        timer = threading.Timer(timeout_s, p.kill)
+        timer.start()
+        entries: deque[JournalEntry] = deque(maxlen=max(int(limit), 1))
+        last = cursor
+        try:
+            for line in p.stdout or ():
+                e = parse_entry(line)
+                if e is None:
+                    continue
+                entries.append(e)
+                last = e.cursor
+            rc = p.wait()
+        finally:
+            timer.cancel()
+        errf.seek(0)
+        err = errf.read().decode("utf-8", errors="replace")
+    if rc < 0:
+        return JournalRead(list(entries), last, 124, f"Timeout running: {' '.join(cmd)}")
+    return JournalRead(list(entries), last, rc, err.strip())
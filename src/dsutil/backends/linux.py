@@ -6,6 +6,7 @@ import subprocess
 from dataclasses import dataclass
 
 from dsutil.backends.base import Backend, CmdResult
+from dsutil.backends.journal import JOURNAL_UNITS, JournalRead, read_journal
 
 
 class LinuxBackend(Backend):
@@ -13,6 +14,9 @@ class LinuxBackend(Backend):
     The 'target' argument is ignored; commands run on the local host.
     """
 
+    def __init__(self, journalctl: str = "journalctl") -> None:
+        self.journalctl = journalctl
+
     def check_available(self) -> tuple[bool, str]:
         # Minimal sanity: we need a shell and systemctl for service checks.
         ok = (self.exec("host", "command -v systemctl >/dev/null 2>&1").rc == 0)
@@ -42,7 +46,11 @@ class LinuxBackend(Backend):
         }
 
     def logs(self, target: str, tail: int = 400) -> str:
-        # Generic system logs hint (not DS logs). Keep it simple.
-        # Collector should read DS log files directly.
-        r = self.exec("host", f"journalctl -n {int(tail)} --no-pager 2>/dev/null || true", timeout_s=10)
-        return r.out or r.err
+        # Last DS/nginx journal entries (not DS log files; the collector reads those directly).
+        r = self.journal(tail=tail)
+        if r.rc != 0 and not r.entries:
+            return r.err
+        return "\n".join(f"{e.ts.isoformat()} {e.unit}: {e.message}" for e in r.entries)
+
+    def journal(self, cursor: str | None = None, tail: int = 400) -> JournalRead:
+        return read_journal(JOURNAL_UNITS, cursor=cursor, limit=tail, journalctl=self.journalctl)
@@ -2,16 +2,157 @@ from __future__ import annotations
 
 import argparse
 import sys
+from pathlib import Path
+from urllib.parse import urlparse
 
 from dsutil.backends.docker import DockerBackend
 from dsutil.collectors.docker_collect import collect_docker_report
 from dsutil.collectors.linux_collect import collect_linux_report
+from dsutil.collectors.loadprobe import DEFAULT_CONVERT_URL, collect_loadprobe_report
 from dsutil.collectors.windows_collect import collect_windows_report
-from dsutil.output.jsonout import to_json
-from dsutil.output.text import print_report
+from dsutil.core.cache import ResultCache
+from dsutil.core.fleet import FleetTable
+from dsutil.core.triage import Triage
+from dsutil.output.jsonout import fleet_to_json, to_json
+from dsutil.output.text import print_fleet, print_report
+
+
+def loadprobe_main(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="dsutil loadprobe",
+        description="Measure DocumentServer conversion latency and throughput",
+    )
+    ap.add_argument(
+        "--url",
+        default=DEFAULT_CONVERT_URL,
+        help="ConvertService endpoint",
+    )
+    ap.add_argument(
+        "--source-url",
+        required=True,
+        help="Document URL the converter should download (must be reachable from DS)",
+    )
+    ap.add_argument(
+        "--filetype",
+        default="docx",
+        help="Source document type",
+    )
+    ap.add_argument(
+        "--outputtype",
+        default="pdf",
+        help="Conversion output type",
+    )
+    ap.add_argument(
+        "--requests",
+        type=int,
+        default=20,
+        help="Conversion requests per concurrency level",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent requests (maximum level with --ramp)",
+    )
+    ap.add_argument(
+        "--ramp",
+        action="store_true",
+        help="Double concurrency from 1 up to --concurrency to find the saturation point",
+    )
+    ap.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Per-request timeout in seconds",
+    )
+    ap.add_argument(
+        "--jwt-secret",
+        default=None,
+        help="Sign requests with this JWT secret (services.CoAuthoring.secret.inbox)",
+    )
+    ap.add_argument(
+        "--jwt-header",
+        default="Authorization",
+        help="Header carrying the JWT",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print JSON report",
+    )
+
+    args = ap.parse_args(argv)
+    if args.requests < 1 or args.concurrency < 1:
+        ap.error("--requests and --concurrency must be positive")
+    for opt, value in (("--url", args.url), ("--source-url", args.source_url)):
+        u = urlparse(value)
+        if u.scheme not in ("http", "https") or not u.netloc:
+            ap.error(f"{opt} must be an absolute http(s) URL: {value}")
+
+    report = collect_loadprobe_report(
+        url=args.url,
+        source_url=args.source_url,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        ramp=args.ramp,
+        filetype=args.filetype,
+        outputtype=args.outputtype,
+        timeout_s=args.timeout,
+        jwt_secret=args.jwt_secret,
+        jwt_header=args.jwt_header,
+    )
+
+    if args.json:
+        print(to_json(report))
+    else:
+        print_report(report)
+
+
+def fleet_main(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="dsutil fleet",
+        description="Aggregate saved JSON reports of many targets",
+    )
+    ap.add_argument(
+        "paths",
+        nargs="+",
+        help="Report files saved with --json, or directories containing them",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print JSON summary",
+    )
+    ap.add_argument(
+        "--reports",
+        action="store_true",
+        help="Include every report in the JSON summary (regular report schema)",
+    )
+
+    args = ap.parse_args(argv)
+    table = FleetTable()
+    for p in args.paths:
+        path = Path(p)
+        for f in sorted(path.glob("*.json")) if path.is_dir() else [path]:
+            try:
+                table.add_file(f)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Skipping {f}: {e}", file=sys.stderr)
+
+    if args.json:
+        print(fleet_to_json(table, reports=args.reports))
+    else:
+        print_fleet(table)
 
 
 def main() -> None:
+    if sys.argv[1:2] == ["loadprobe"]:
+        loadprobe_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["fleet"]:
+        fleet_main(sys.argv[2:])
+        return
+
     ap = argparse.ArgumentParser(
         prog="dsutil",
         description="ONLYOFFICE DocumentServer diagnostics utility",
@@ -44,8 +185,28 @@ def main() -> None:
         default=800,
         help="How many lines to tail from DS log files",
     )
+    ap.add_argument(
+        "--samples",
+        type=int,
+        default=5,
+        help="Resource samples to take of DS processes, 0 disables (docker/linux)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run every check instead of reusing cached results (docker/linux)",
+    )
+    ap.add_argument(
+        "--triage",
+        action="store_true",
+        help="Check tier by tier and stop at the first tier that explains a critical failure",
+    )
 
     args = ap.parse_args()
+    cache = ResultCache(enabled=not args.no_cache)
+    triage = Triage(enabled=args.triage)
+    # resource sampling takes seconds; triage must answer quickly
+    samples = 0 if args.triage else args.samples
 
     if args.platform == "docker":
         backend = DockerBackend()
@@ -54,20 +215,25 @@ def main() -> None:
             container=args.ds,
             docker_tail=args.docker_tail,
             file_tail=args.file_tail,
+            samples=samples,
+            cache=cache,
+            triage=triage,
         )
 
     elif args.platform == "linux":
         # docker-specific args are intentionally ignored
-        report = collect_linux_report(file_tail=args.file_tail)
+        report = collect_linux_report(file_tail=args.file_tail, samples=samples, cache=cache, triage=triage)
 
     elif args.platform == "windows":
-        report = collect_windows_report(file_tail=args.file_tail)
+        report = collect_windows_report(file_tail=args.file_tail, triage=triage)
 
     else:
         # Should never happen because of argparse choices
         print(f"Unknown platform: {args.platform}", file=sys.stderr)
         sys.exit(2)
 
+    cache.save()
+
     if args.json:
         print(to_json(report))
     else:
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import json
+import os
 import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
 from dsutil.backends.base import Backend
+from dsutil.collectors.resources import add_resource_checks, sample_container
+from dsutil.collectors.supervisor_rpc import (
+    RESTART_WINDOW_S,
+    SupervisorRPCError,
+    container_transport,
+    probe_supervisor,
+    track_restarts,
+)
+from dsutil.core.baseline import BaselineStore
+from dsutil.core.cache import ResultCache, file_key
 from dsutil.core.models import CheckResult, Issue, Report
+from dsutil.core.redact import redact_env
 from dsutil.core.report import finalize
 from dsutil.core.rules import default_rules, scan_text
+from dsutil.core.tail import tail_bytes, tail_file
+from dsutil.core.triage import Triage
 
 REQUIRED_PROGRAMS = {"ds:docservice", "ds:converter"}
 OPTIONAL_PROGRAMS = {"ds:adminpanel", "ds:example", "ds:metrics"}
@@ -22,6 +37,12 @@ DS_LOG_TARGETS = [
     f"{DS_LOG_BASE}/nginx.error.log",
 ]
 
+DOCKER_SOCKET = "/var/run/docker.sock"
+DOCKER_ROOT = "/var/lib/docker"
+AVAILABLE_TTL_S = 600
+INSPECT_TTL_S = 300
+NGINX_TTL_S = 300
+
 _SUP_RE = re.compile(r"^(?P<name>\S+)\s+(?P<state>RUNNING|STOPPED|FATAL|BACKOFF|EXITED|STARTING)\s+(?P<rest>.*)$")
 
 
@@ -46,53 +67,168 @@ def _tail_file(backend: Backend, target: str, path: str, lines: int) -> tuple[bo
     return (r2.out.strip() == "EXISTS"), (r.out or r.err)
 
 
+def _host_path(ins: dict, path: str) -> str | None:
+    """Host path of a container path that lives on a bind mount/volume visible from here."""
+    best: dict | None = None
+    for m in ins.get("Mounts") or []:
+        dest = str(m.get("Destination") or "").rstrip("/")
+        if not dest or not m.get("Source"):
+            continue
+        if (path == dest or path.startswith(dest + "/")) and (best is None or len(dest) > len(best["Destination"].rstrip("/"))):
+            best = m
+    if best is None or not os.path.isdir(best["Source"]):
+        return None
+    return best["Source"].rstrip("/") + path[len(best["Destination"].rstrip("/")):]
+
+
+def _read_ds_log(backend: Backend, container: str, ins: dict, path: str, lines: int) -> tuple[bool, str, str]:
+    """(exists, content, via): read through the host mount when possible, exec otherwise."""
+    host = _host_path(ins, path)
+    if host is not None:
+        try:
+            exists, content = tail_file(host, lines)
+            return exists, content, "mount"
+        except OSError:
+            # e.g. DS-owned 0640 logs and a non-root operator: read inside the container
+            pass
+    exists, content = _tail_file(backend, container, path, lines)
+    return exists, content, "exec"
+
+
+def _container_logs(backend: Backend, container: str, ins: dict, tail: int) -> tuple[str, str]:
+    """Container stdout/stderr from the json-file driver's LogPath; `docker logs` otherwise."""
+    log_cfg = ((ins.get("HostConfig") or {}).get("LogConfig") or {})
+    log_path = ins.get("LogPath")
+    if log_cfg.get("Type", "json-file") == "json-file" and log_path:
+        try:
+            raw = tail_bytes(log_path, tail)
+        except OSError:
+            raw = None
+        if raw is not None:
+            out: list[str] = []
+            for line in raw.decode("utf-8", errors="replace").splitlines():
+                try:
+                    out.append(str(json.loads(line).get("log", "")))
+                except (ValueError, AttributeError):
+                    continue
+            return "".join(out), "json-file LogPath"
+    return backend.logs(container, tail=tail), f"docker logs --tail {tail}"
+
+
+def _inspect(backend: Backend, container: str, cache: ResultCache) -> tuple[dict, bool]:
+    # docker rewrites config.v2.json on every state/health change, so its stat is a
+    # cheap validation key for the whole inspect document
+    prev = cache.peek(f"docker_inspect:{container}")
+    if isinstance(prev, dict) and prev.get("Id"):
+        hit = cache.get(f"docker_inspect:{container}", file_key([_container_config(prev["Id"])]))
+        if hit is not None:
+            return hit, True
+    ins = backend.inspect(container)
+    if "_error" not in ins and ins.get("Id"):
+        key = file_key([_container_config(ins["Id"])])
+        if key[0][1] is not None:
+            cfg = dict(ins.get("Config") or {})
+            cfg["Env"] = redact_env(cfg.get("Env") or [])
+            cache.put(f"docker_inspect:{container}", key, {**ins, "Config": cfg}, INSPECT_TTL_S)
+    return ins, False
+
+
+def _container_config(container_id: str) -> str:
+    return f"{DOCKER_ROOT}/containers/{container_id}/config.v2.json"
+
+
+# nginx's own exit status goes on a last marker line: the exec status alone cannot tell an
+# invalid config (1) from a docker exec failure such as a restarting container (also 1)
+_NGINX_TEST_SH = 'out=$(nginx -t 2>&1); rc=$?; printf "%s\\n" "$out" | tail -n 80; echo "nginx_rc=$rc"'
+
+
+def _nginx_test(backend: Backend, container: str) -> list:
+    """[nginx -t exit status, output]; the status is None when the test did not complete."""
+    n = backend.exec(container, _NGINX_TEST_SH, timeout_s=10)
+    lines = n.out.rstrip("\n").split("\n")
+    rc = lines[-1].removeprefix("nginx_rc=")
+    if n.rc == 0 and rc != lines[-1] and rc.isdigit():
+        return [int(rc), "\n".join(lines[:-1])]
+    return [None, n.err or n.out]
+
+
 def collect_docker_report(
     backend: Backend,
     container: str,
     docker_tail: int = 400,
     file_tail: int = 800,
+    samples: int = 5,
+    cache: ResultCache | None = None,
+    triage: Triage | None = None,
 ) -> Report:
     ts = datetime.now(timezone.utc).isoformat()
     report = Report(tool="dsutil", timestamp_utc=ts, platform="docker", target=container)
 
-    ok, info = backend.check_available()
+    cache = cache or ResultCache(enabled=False)
+    triage = triage or Triage()
+
+    # tier: container state and health endpoint
+    avail = cache.get("docker_available", file_key([DOCKER_SOCKET]))
+    if avail is None:
+        ok, info = backend.check_available()
+        if ok:
+            cache.put("docker_available", file_key([DOCKER_SOCKET]), [ok, info], AVAILABLE_TTL_S)
+    else:
+        ok, info = avail
+    report.add_check(CheckResult("docker_available", ok, "docker version", info, cached=avail is not None))
     if not ok:
         report.add_issue(Issue("crit", "Docker is not available", info))
+        triage.stop(report, "state")
         return finalize(report)
 
-    ins = backend.inspect(container)
+    ins, ins_cached = _inspect(backend, container, cache)
     if "_error" in ins:
         report.add_issue(Issue("crit", "Container inspect failed", ins["_error"]))
+        triage.stop(report, "state")
         return finalize(report)
 
     state = (ins.get("State") or {})
     running = bool(state.get("Running"))
     health = ((state.get("Health") or {}).get("Status")) if state.get("Health") else None
 
-    report.add_check(CheckResult("container_running", running, "docker inspect .State.Running", state.get("Status")))
+    report.add_check(CheckResult("container_running", running, "docker inspect .State.Running", state.get("Status"), cached=ins_cached))
     if health:
-        report.add_check(CheckResult("container_health", health == "healthy", "docker inspect .State.Health", health))
+        report.add_check(CheckResult("container_health", health == "healthy", "docker inspect .State.Health", health, cached=ins_cached))
         if health != "healthy":
-            report.add_issue(Issue("crit", f"Container health is {health}", "Check DS services and logs."))
+            report.add_issue(triage.symptom(Issue("crit", f"Container health is {health}", "Check DS services and logs.")))
 
     if not running:
         report.add_issue(Issue("crit", "Container is not running", "Check docker logs/inspect."))
+        triage.stop(report, "state")
         return finalize(report)
 
     # Health endpoint
     r = backend.exec(container, "curl -fsS http://localhost:8000/info/info.json | head -c 400", timeout_s=10)
     report.add_check(CheckResult("health_endpoint", r.rc == 0, "curl http://localhost:8000/info/info.json", r.out or r.err))
     if r.rc != 0:
-        report.add_issue(Issue("crit", "Health endpoint failed", "Most often docservice/converter is down or nginx routing is broken."))
+        report.add_issue(triage.symptom(Issue("crit", "Health endpoint failed", "Most often docservice/converter is down or nginx routing is broken.")))
+    if triage.stop(report, "state"):
+        return finalize(report)
 
-    # supervisorctl status (IMPORTANT: do NOT treat non-zero rc as failure if output is parseable)
-    s = backend.exec(container, "supervisorctl status 2>&1", timeout_s=10)
-    sup = _parse_supervisor_status(s.out or s.err)
-    usable = bool(sup)
-    report.add_check(CheckResult("supervisorctl_status", usable, "supervisorctl status", {"exit_code": s.rc, "raw": (s.out or s.err), "parsed": sup}))
+    # tier: services
+    # supervisord state via XML-RPC (one round trip); fall back to parsing supervisorctl text
+    transport = container_transport(backend, container, ins)
+    try:
+        sup = probe_supervisor(transport, REQUIRED_PROGRAMS | OPTIONAL_PROGRAMS)
+        track_restarts(sup, container)
+        report.add_check(CheckResult("supervisor_rpc", True, f"supervisor.getAllProcessInfo ({type(transport).__name__})", sup))
+        usable = True
+    except SupervisorRPCError as e:
+        report.add_check(CheckResult("supervisor_rpc", False, f"supervisor.getAllProcessInfo ({type(transport).__name__})", str(e)))
+        # supervisorctl status (IMPORTANT: do NOT treat non-zero rc as failure if output is parseable)
+        s = backend.exec(container, "supervisorctl status 2>&1", timeout_s=10)
+        sup = _parse_supervisor_status(s.out or s.err)
+        usable = bool(sup)
+        report.add_check(CheckResult("supervisorctl_status", usable, "supervisorctl status", {"exit_code": s.rc, "raw": (s.out or s.err), "parsed": sup}))
 
     if not usable:
         report.add_issue(Issue("crit", "supervisorctl could not query supervisord", "Check supervisord and /var/log/supervisor/supervisord.log."))
+        triage.stop(report, "services")
         return finalize(report)
 
     # required services must be RUNNING
@@ -103,6 +239,8 @@ def collect_docker_report(
             continue
         if stp["state"] != "RUNNING":
             report.add_issue(Issue("crit", f"Required service not RUNNING: {p} ({stp['state']})", f"Check logs in {DS_LOG_BASE}/{p.split(':',1)[1]}/"))
+        elif stp.get("restart_loop"):
+            report.add_issue(Issue("crit", f"Required service is restarting repeatedly: {p}", f"{stp['recent_starts'] or 'Several'} starts within {RESTART_WINDOW_S // 60} min; check logs in {DS_LOG_BASE}/{p.split(':',1)[1]}/"))
 
     # optional services: STOPPED is OK; unhealthy states warn
     for p in sorted(OPTIONAL_PROGRAMS):
@@ -111,14 +249,30 @@ def collect_docker_report(
             continue
         if stp["state"] in ("FATAL", "BACKOFF", "EXITED"):
             report.add_issue(Issue("warn", f"Optional service unhealthy: {p} ({stp['state']})", "If enabled manually, inspect its logs/config."))
+        elif stp.get("restart_loop"):
+            report.add_issue(Issue("warn", f"Optional service is restarting repeatedly: {p}", "If enabled manually, inspect its logs/config."))
 
-    # nginx config test
-    n = backend.exec(container, "nginx -t 2>&1 | tail -n 80", timeout_s=10)
-    if n.rc != 127:
-        report.add_check(CheckResult("nginx_test", n.rc == 0, "nginx -t", n.out or n.err))
-        if n.rc != 0:
+    # nginx config test (cached until the container restarts)
+    nkey = [ins.get("Id"), state.get("StartedAt")]
+    # only a completed test (valid/invalid config) is cached, never a timeout or exec failure
+    (nrc, nout), n_cached = cache.cached(
+        f"nginx_rc:{container}", nkey, NGINX_TTL_S, lambda: _nginx_test(backend, container),
+        keep=lambda v: v[0] is not None,
+    )
+    if nrc != 127:
+        report.add_check(CheckResult("nginx_test", nrc == 0, "nginx -t", nout, cached=n_cached))
+        if nrc != 0:
             report.add_issue(Issue("warn", "nginx -t failed", "Inspect nginx configs and includes."))
 
+    # resource usage of DS processes (all samples in one exec)
+    if samples > 0:
+        smp, err = sample_container(backend, container, samples)
+        add_resource_checks(report, smp, f"sample /proc and cgroup ({samples}x)", err)
+
+    if triage.stop(report, "services"):
+        return finalize(report)
+
+    # tier: dependencies
     # postgresql check
     pg = backend.exec(container, "pg_isready -h localhost -p 5432 2>&1", timeout_s=10)
     if pg.rc != 127:
@@ -139,20 +293,29 @@ def collect_docker_report(
     report.add_check(CheckResult("redis_ping", okr, "redis-cli ping", rr.out or rr.err))
     if not okr:
         report.add_issue(Issue("warn", "Redis ping failed", "Redis is not running or not responding; check /var/log/redis/*.log if Redis is expected."))
+    if triage.stop(report, "dependencies"):
+        return finalize(report)
 
-    # docker logs scan (broad)
-    dlogs = backend.logs(container, tail=docker_tail)
-    for i in scan_text(dlogs, default_rules()):
+    # tier: logs
+    # docker logs scan (broad); rate rules compare against per-source baselines
+    rules = default_rules()
+    baselines = BaselineStore()
+    dlogs, dlogs_via = _container_logs(backend, container, ins, docker_tail)
+    report.add_check(CheckResult("docker_logs", not dlogs.startswith("[logs error]"), dlogs_via, {"bytes": len(dlogs)}))
+    for i in scan_text(dlogs, rules, baselines, f"{container}:stdout"):
         report.add_issue(i)
 
-    # DS log snippets scan (targeted)
+    # DS log snippets scan (targeted); host mounts are read directly, exec only as a fallback
     snippets: dict[str, str] = {}
     for p in DS_LOG_TARGETS:
-        exists, content = _tail_file(backend, container, p, file_tail)
+        exists, content, via = _read_ds_log(backend, container, ins, p, file_tail)
         if exists:
-            snippets[p] = content
-            for i in scan_text(content, default_rules()):
+            snippets[p] = via
+            for i in scan_text(content, rules, baselines, f"{container}:{p}"):
                 report.add_issue(i)
-    report.add_check(CheckResult("ds_log_snippets", True, f"tail DS logs ({file_tail} lines)", {"files": list(snippets.keys())}))
+    report.add_check(CheckResult("ds_log_snippets", True, f"tail DS logs ({file_tail} lines)", {"files": list(snippets.keys()), "via": snippets}))
+    report.add_check(CheckResult("log_rates", True, "hits/min vs baseline", baselines.observed))
+    baselines.save()
+    triage.stop(report, "logs")
 
     return finalize(report)
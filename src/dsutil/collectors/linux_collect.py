@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import glob
 import json
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urlparse
 
 from dsutil.backends.base import Backend
+from dsutil.backends.journal import JOURNAL_UNITS
 from dsutil.backends.linux import LinuxBackend
+from dsutil.collectors.resources import add_resource_checks, sample_local
+from dsutil.core.baseline import BaselineStore
+from dsutil.core.cache import ResultCache, file_key
 from dsutil.core.models import CheckResult, Issue, Report
 from dsutil.core.report import finalize
-from dsutil.core.rules import default_rules, scan_text
+from dsutil.core.rules import default_rules, scan_entries, scan_text
+from dsutil.core.state import load_state, save_state
+from dsutil.core.triage import Triage
 
 TARGET_HOST = "host"
 LOCAL_JSON = Path("/etc/onlyoffice/documentserver/local.json")
+JOURNAL_STATE = "journal.json"
 
 REQUIRED_UNITS = ["ds-docservice.service", "ds-converter.service"]
 OPTIONAL_UNITS = ["ds-adminpanel.service", "ds-example.service", "ds-metrics.service"]
@@ -30,6 +38,16 @@ NGINX_FILES = [
     "/etc/nginx/conf.d/ds.conf",
     "/etc/onlyoffice/documentserver/nginx/ds.conf",
 ]
+NGINX_DIRS = [
+    "/etc/nginx/conf.d",
+    "/etc/nginx/includes",
+    "/etc/onlyoffice/documentserver/nginx",
+    "/etc/onlyoffice/documentserver/nginx/includes",
+]
+
+AVAILABLE_TTL_S = 3600
+NGINX_TTL_S = 600
+LOCAL_JSON_TTL_S = 3600
 
 
 def _tail_file(backend: Backend, target: str, path: str, lines: int) -> tuple[bool, str]:
@@ -45,6 +63,40 @@ def _load_local_json() -> dict | None:
         return None
 
 
+def _local_json_endpoints() -> dict[str, list | None] | None:
+    cfg = _load_local_json()
+    if cfg is None:
+        return None
+    deps: dict[str, list | None] = {"postgres": None, "redis": None, "rabbitmq": None}
+
+    sql = (((cfg.get("services") or {}).get("CoAuthoring") or {}).get("sql") or {})
+    if sql:
+        deps["postgres"] = [str(sql.get("dbHost", "localhost")), int(sql.get("dbPort", 5432))]
+
+    red = (((cfg.get("services") or {}).get("CoAuthoring") or {}).get("redis") or {})
+    if red:
+        deps["redis"] = [str(red.get("host", "localhost")), int(red.get("port", 6379)) if "port" in red else 6379]
+
+    rmq_url = (cfg.get("rabbitmq") or {}).get("url")
+    if rmq_url:
+        u = urlparse(rmq_url)
+        deps["rabbitmq"] = [u.hostname or "localhost", u.port or 5672]
+    return deps
+
+
+def _nginx_key_paths() -> list[str]:
+    # nginx -t depends on every included file; dir mtimes catch added/removed includes
+    paths = list(NGINX_FILES) + list(NGINX_DIRS)
+    for d in NGINX_DIRS:
+        paths += sorted(glob.glob(f"{d}/*.conf"))
+    return paths
+
+
+def _nginx_test(backend: Backend) -> list:
+    nt = backend.exec(TARGET_HOST, "nginx -t 2>&1", timeout_s=10)
+    return [nt.rc, (nt.out or nt.err or "").strip()]
+
+
 def _tcp_check(backend: Backend, target: str, host: str, port: int) -> tuple[bool, str]:
     r = backend.exec(
         target,
@@ -56,14 +108,31 @@ def _tcp_check(backend: Backend, target: str, host: str, port: int) -> tuple[boo
     return ok, msg
 
 
-def collect_linux_report(file_tail: int = 800) -> Report:
+def collect_linux_report(
+    file_tail: int = 800,
+    samples: int = 5,
+    backend: LinuxBackend | None = None,
+    cache: ResultCache | None = None,
+    triage: Triage | None = None,
+) -> Report:
     ts = datetime.now(timezone.utc).isoformat()
     report = Report(tool="dsutil", timestamp_utc=ts, platform="linux", target=TARGET_HOST)
 
-    backend = LinuxBackend()
-    ok, info = backend.check_available()
+    backend = backend or LinuxBackend()
+    cache = cache or ResultCache(enabled=False)
+    triage = triage or Triage()
+
+    # tier: backend and health endpoint
+    avail = cache.get("linux_available", [])
+    if avail is None:
+        ok, info = backend.check_available()
+        if ok:
+            cache.put("linux_available", [], [ok, info], AVAILABLE_TTL_S)
+    else:
+        ok, info = avail
     if not ok:
         report.add_issue(Issue("crit", "Linux backend is not available", info))
+        triage.stop(report, "state")
         return finalize(report)
 
     # Health endpoint
@@ -81,8 +150,11 @@ def collect_linux_report(file_tail: int = 800) -> Report:
         )
     )
     if h.rc != 0:
-        report.add_issue(Issue("crit", "Health endpoint check failed", "Check nginx/docservice/converter status and logs."))
+        report.add_issue(triage.symptom(Issue("crit", "Health endpoint check failed", "Check nginx/docservice/converter status and logs.")))
+    if triage.stop(report, "state"):
+        return finalize(report)
 
+    # tier: services
     # systemd units (required)
     for unit in REQUIRED_UNITS:
         r = backend.exec(TARGET_HOST, f"systemctl is-active {unit} 2>&1", timeout_s=10)
@@ -106,15 +178,20 @@ def collect_linux_report(file_tail: int = 800) -> Report:
     if not ok_ns:
         report.add_issue(Issue("crit", "Nginx is not active", "Check `systemctl status nginx` and nginx logs."))
 
-    nt = backend.exec(TARGET_HOST, "nginx -t 2>&1", timeout_s=10)
-    out = (nt.out or nt.err or "").strip()
+    nkey = file_key(_nginx_key_paths())
+    # only a completed test is cached, never a timeout or exec failure
+    (nt_rc, out), nt_cached = cache.cached(
+        f"nginx_test:{TARGET_HOST}", nkey, NGINX_TTL_S, lambda: _nginx_test(backend),
+        keep=lambda v: v[0] != 124 and bool(v[1]),
+    )
 
     fatal = any(x in out.lower() for x in ("test failed", "emerg", "is invalid"))
 
-    # IMPORTANT: do NOT use rc here. nginx -t can warn and still be valid.
-    ok = not fatal
+    # IMPORTANT: do NOT use rc for validity. nginx -t can warn and still be valid.
+    # Only a timeout (124) means the test did not run to completion.
+    ok = not fatal and nt_rc != 124
 
-    report.add_check(CheckResult("nginx_test", ok, "nginx -t", out))
+    report.add_check(CheckResult("nginx_test", ok, "nginx -t", out, cached=nt_cached))
 
     if fatal:
         report.add_issue(Issue("crit", "Nginx config test failed", "Fix nginx configuration errors before continuing."))
@@ -122,53 +199,84 @@ def collect_linux_report(file_tail: int = 800) -> Report:
         report.add_issue(Issue("warn", "Nginx config warnings detected", "Warnings are usually safe; review nginx.conf directives if needed."))
 
     # nginx include tree sanity
-    missing = [p for p in NGINX_FILES if backend.exec(TARGET_HOST, f"test -e {p}", timeout_s=5).rc != 0]
-    report.add_check(CheckResult("nginx_tree", len(missing) == 0, "validate nginx include tree", {"missing": missing}))
+    missing, tree_cached = cache.cached(
+        "nginx_tree", nkey, NGINX_TTL_S,
+        lambda: [p for p in NGINX_FILES if backend.exec(TARGET_HOST, f"test -e {p}", timeout_s=5).rc != 0],
+    )
+    report.add_check(CheckResult("nginx_tree", len(missing) == 0, "validate nginx include tree", {"missing": missing}, cached=tree_cached))
     if missing:
         report.add_issue(Issue("warn", "Some nginx DS config files are missing", "Check /etc/nginx/conf.d/ds.conf and /etc/nginx/includes/*.conf links."))
 
-    # Parse local.json and check deps connectivity
-    cfg = _load_local_json()
-    if cfg is None:
+    # resource usage of DS processes
+    if samples > 0:
+        add_resource_checks(report, sample_local(samples), f"sample /proc and cgroup ({samples}x)")
+
+    if triage.stop(report, "services"):
+        return finalize(report)
+
+    # tier: dependencies
+    # Parse local.json and check deps connectivity (only endpoints are cached, never credentials)
+    deps, deps_cached = cache.cached("local_json", file_key([LOCAL_JSON]), LOCAL_JSON_TTL_S, _local_json_endpoints)
+    if deps is None:
         report.add_check(CheckResult("local_json", False, f"read {LOCAL_JSON}", "Failed to read or parse local.json"))
         report.add_issue(Issue("warn", "Cannot read local.json", "Dependency checks may be incomplete. Ensure local.json exists and is valid JSON."))
     else:
-        report.add_check(CheckResult("local_json", True, f"read {LOCAL_JSON}", "OK"))
+        report.add_check(CheckResult("local_json", True, f"read {LOCAL_JSON}", "OK", cached=deps_cached))
 
-        sql = (((cfg.get("services") or {}).get("CoAuthoring") or {}).get("sql") or {})
-        if sql:
-            host = str(sql.get("dbHost", "localhost"))
-            port = int(sql.get("dbPort", 5432))
+        if deps.get("postgres"):
+            host, port = deps["postgres"]
             ok_dep, msg = _tcp_check(backend, TARGET_HOST, host, port)
             report.add_check(CheckResult("postgres_tcp", ok_dep, f"tcp {host}:{port}", msg))
             if not ok_dep:
                 report.add_issue(Issue("crit", "PostgreSQL is not reachable", "Check DB host/port in local.json and network connectivity."))
 
-        red = (((cfg.get("services") or {}).get("CoAuthoring") or {}).get("redis") or {})
-        if red:
-            host = str(red.get("host", "localhost"))
-            port = int(red.get("port", 6379)) if "port" in red else 6379
+        if deps.get("redis"):
+            host, port = deps["redis"]
             ok_dep, msg = _tcp_check(backend, TARGET_HOST, host, port)
             report.add_check(CheckResult("redis_tcp", ok_dep, f"tcp {host}:{port}", msg))
             if not ok_dep:
                 report.add_issue(Issue("crit", "Redis is not reachable", "Check redis host/port in local.json and network connectivity."))
 
-        rmq_url = (cfg.get("rabbitmq") or {}).get("url")
-        if rmq_url:
-            u = urlparse(rmq_url)
-            host = u.hostname or "localhost"
-            port = u.port or 5672
+        if deps.get("rabbitmq"):
+            host, port = deps["rabbitmq"]
             ok_dep, msg = _tcp_check(backend, TARGET_HOST, host, port)
             report.add_check(CheckResult("rabbitmq_tcp", ok_dep, f"tcp {host}:{port}", msg))
             if not ok_dep:
                 report.add_issue(Issue("crit", "RabbitMQ is not reachable", "Check rabbitmq.url in local.json and network connectivity."))
+    if triage.stop(report, "dependencies"):
+        return finalize(report)
 
-    # DS log scan
+    # tier: logs
+    # DS log scan; rate rules compare against per-source baselines
     rules = default_rules()
+    baselines = BaselineStore()
     for p in DS_LOG_TARGETS:
         exists, content = _tail_file(backend, TARGET_HOST, p, file_tail)
         if exists and content:
-            for i in scan_text(content, rules):
+            for i in scan_text(content, rules, baselines, f"{TARGET_HOST}:{p}"):
                 report.add_issue(i)
 
+    # journald for DS units and nginx, resumed after the entry the previous run stopped at
+    cursor = (load_state(JOURNAL_STATE) or {}).get("cursor")
+    j = backend.journal(cursor=cursor, tail=file_tail)
+    if j.rc not in (0, 124, 127) and cursor:
+        # journalctl rejected the cursor (journal rotated/vacuumed): start over from the tail;
+        # a timeout says nothing about the cursor and a second read would likely hang too
+        cursor = None
+        j = backend.journal(tail=file_tail)
+    cmd = f"journalctl -o json {' '.join(f'-u {u}' for u in JOURNAL_UNITS)}" + (" --after-cursor" if cursor else f" -n {file_tail}")
+    if j.rc == 0:
+        issues, hits = scan_entries(((e.ts, e.message) for e in j.entries), rules, baselines, f"{TARGET_HOST}:journal")
+        for i in issues:
+            report.add_issue(i)
+        report.add_check(CheckResult("journal_scan", True, cmd, {"entries": len(j.entries), "resumed": cursor is not None, "hits": hits}))
+        if j.cursor:
+            save_state(JOURNAL_STATE, {"cursor": j.cursor})
+    else:
+        report.add_check(CheckResult("journal_scan", False, cmd, j.err or f"rc={j.rc}"))
+
+    report.add_check(CheckResult("log_rates", True, "hits/min vs baseline", baselines.observed))
+    baselines.save()
+    triage.stop(report, "logs")
+
     return finalize(report)
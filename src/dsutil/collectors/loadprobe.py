@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import math
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from dsutil.core.models import CheckResult, Issue, Report
+from dsutil.core.report import finalize
+
+DEFAULT_CONVERT_URL = "http://localhost/ConvertService.ashx"
+
+# Ramp-up stops once a doubling of concurrency adds less than this much throughput.
+SATURATION_GAIN = 1.10
+MAX_ERROR_RATE = 0.05
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def sign_jwt(payload: dict[str, Any], secret: str) -> str:
+    """HS256 JWT as expected by DocumentServer's inbox token check."""
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    sig = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64url(sig)}"
+
+
+def _request_body(source_url: str, filetype: str, outputtype: str) -> dict[str, Any]:
+    return {
+        "async": False,
+        "filetype": filetype,
+        "key": uuid.uuid4().hex,  # unique key so DS does not serve a cached result
+        "outputtype": outputtype,
+        "title": f"dsutil-loadprobe.{filetype}",
+        "url": source_url,
+    }
+
+
+def convert_once(
+    url: str,
+    source_url: str,
+    filetype: str,
+    outputtype: str,
+    timeout_s: float,
+    jwt_secret: str | None = None,
+    jwt_header: str = "Authorization",
+) -> tuple[float, str | None]:
+    """Send one synchronous conversion; returns (latency seconds, error category or None)."""
+    body = _request_body(source_url, filetype, outputtype)
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if jwt_secret:
+        # both tokens sign the plain request, not each other
+        headers[jwt_header] = "Bearer " + sign_jwt({"payload": body}, jwt_secret)
+        body["token"] = sign_jwt(body, jwt_secret)
+    try:
+        req = urllib.request.Request(url, json.dumps(body).encode(), headers, method="POST")
+    except ValueError:
+        return 0.0, "invalid_url"
+
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            data = resp.read()
+    except urllib.error.HTTPError as e:
+        return time.perf_counter() - t0, f"http_{e.code}"
+    except TimeoutError:
+        return time.perf_counter() - t0, "timeout"
+    except urllib.error.URLError as e:
+        kind = "timeout" if isinstance(e.reason, TimeoutError) else "connection"
+        return time.perf_counter() - t0, kind
+    except OSError:
+        return time.perf_counter() - t0, "connection"
+    except http.client.HTTPException:
+        # IncompleteRead, BadStatusLine, ...
+        return time.perf_counter() - t0, "protocol"
+    except ValueError:
+        return time.perf_counter() - t0, "invalid_url"
+    elapsed = time.perf_counter() - t0
+
+    try:
+        res = json.loads(data)
+    except ValueError:
+        return elapsed, "invalid_response"
+    if not isinstance(res, dict):
+        return elapsed, "invalid_response"
+    if res.get("error"):
+        return elapsed, f"convert_error_{res['error']}"
+    if not res.get("endConvert"):
+        return elapsed, "not_finished"
+    return elapsed, None
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    # nearest-rank on a sorted list
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def _ms(v: float | None) -> float | None:
+    return None if v is None else round(v * 1000, 1)
+
+
+def run_load(
+    url: str,
+    source_url: str,
+    requests: int,
+    concurrency: int,
+    filetype: str = "docx",
+    outputtype: str = "pdf",
+    timeout_s: float = 60.0,
+    jwt_secret: str | None = None,
+    jwt_header: str = "Authorization",
+) -> dict[str, Any]:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(convert_once, url, source_url, filetype, outputtype, timeout_s, jwt_secret, jwt_header)
+            for _ in range(requests)
+        ]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+
+    ok = sorted(lat for lat, err in results if err is None)
+    errors = Counter(err for _, err in results if err is not None)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(ok),
+        "failed": sum(errors.values()),
+        "error_rate": round(sum(errors.values()) / requests, 3) if requests else 0.0,
+        "errors": dict(errors),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 3) if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": _ms(_percentile(ok, 50)),
+            "p95": _ms(_percentile(ok, 95)),
+            "p99": _ms(_percentile(ok, 99)),
+            "max": _ms(ok[-1] if ok else None),
+        },
+    }
+
+
+def _ramp_levels(max_concurrency: int) -> list[int]:
+    levels, c = [], 1
+    while c < max_concurrency:
+        levels.append(c)
+        c *= 2
+    return levels + [max_concurrency]
+
+
+def collect_loadprobe_report(
+    url: str,
+    source_url: str,
+    requests: int = 20,
+    concurrency: int = 4,
+    ramp: bool = False,
+    filetype: str = "docx",
+    outputtype: str = "pdf",
+    timeout_s: float = 60.0,
+    jwt_secret: str | None = None,
+    jwt_header: str = "Authorization",
+) -> Report:
+    ts = datetime.now(timezone.utc).isoformat()
+    report = Report(tool="dsutil", timestamp_utc=ts, platform="loadprobe", target=url)
+
+    levels = _ramp_levels(concurrency) if ramp else [concurrency]
+    best: dict[str, Any] | None = None
+    saturation: int | None = None
+    for c in levels:
+        stats = run_load(url, source_url, requests, c, filetype, outputtype, timeout_s, jwt_secret, jwt_header)
+        ok = stats["error_rate"] <= MAX_ERROR_RATE
+        report.add_check(CheckResult(f"convert_load_c{c}", ok, f"POST {url} x{requests} (concurrency {c})", stats))
+        if not ok:
+            report.add_issue(Issue(
+                "crit" if stats["succeeded"] == 0 else "warn",
+                f"Conversion errors at concurrency {c} ({stats['error_rate']:.0%})",
+                "Check converter logs; errors: " + ", ".join(f"{k}={v}" for k, v in sorted(stats["errors"].items())),
+            ))
+        if stats["succeeded"]:
+            lat = stats["latency_ms"]
+            report.add_issue(Issue(
+                "info",
+                f"Concurrency {c}: p50 {lat['p50']} ms, p95 {lat['p95']} ms, p99 {lat['p99']} ms, "
+                f"{stats['throughput_rps']} conversions/s",
+                f"{stats['succeeded']}/{stats['requests']} conversions succeeded.",
+            ))
+        if not ramp:
+            break
+        if not ok or (best is not None and stats["throughput_rps"] < best["throughput_rps"] * SATURATION_GAIN):
+            saturation = best["concurrency"] if best is not None else None
+            break
+        best = stats
+
+    if ramp:
+        report.add_check(CheckResult(
+            "convert_saturation",
+            True,
+            f"ramp concurrency {levels[0]}..{levels[-1]}",
+            {"saturation_concurrency": saturation, "peak_throughput_rps": best["throughput_rps"] if best else None},
+        ))
+        if saturation is not None:
+            report.add_issue(Issue(
+                "info",
+                f"Conversion throughput saturates at concurrency {saturation}",
+                "Higher parallelism adds latency without throughput; size converter workers/CPU accordingly.",
+            ))
+
+    return finalize(report)
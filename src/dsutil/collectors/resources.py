@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import pairwise
+from statistics import fmean
+from typing import Any
+
+from dsutil.backends.base import Backend
+from dsutil.core.models import CheckResult, Issue, Report
+
+DS_PROCESSES = ("docservice", "converter", "nginx")
+PROC_ROOT = "/proc"
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+SAMPLE_INTERVAL_S = 0.2
+FD_WARN_RATIO = 0.8
+MEM_WARN_RATIO = 0.9
+
+
+@dataclass
+class ProcSample:
+    comm: str
+    ticks: int
+    rss_kb: int
+    fds: int
+    cgroup: str | None
+
+
+@dataclass
+class CgroupSample:
+    mem_current: int | None
+    mem_max: int | None
+    cpu_usec: int | None
+
+
+@dataclass
+class Sample:
+    uptime: float
+    procs: dict[int, ProcSample] = field(default_factory=dict)
+    cgroups: dict[str, CgroupSample] = field(default_factory=dict)
+
+
+@dataclass
+class Samples:
+    clk_tck: int
+    nofile: dict[int, int] = field(default_factory=dict)
+    samples: list[Sample] = field(default_factory=list)
+
+
+def _stat_ticks(stat: str) -> int:
+    # comm may contain spaces/parens: fields after the last ')' start at field 3 (state)
+    rest = stat[stat.rindex(")") + 2:].split()
+    return int(rest[11]) + int(rest[12])  # utime + stime
+
+
+def _int_or_none(v: str | None) -> int | None:
+    v = (v or "").strip()
+    return int(v) if v.isdigit() else None
+
+
+def _cpu_usec(cpu_stat: str) -> int | None:
+    for line in cpu_stat.splitlines():
+        k, _, v = line.partition(" ")
+        if k == "usage_usec":
+            return _int_or_none(v)
+    return None
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _find_pids(names: tuple[str, ...]) -> dict[int, str]:
+    pids: dict[int, str] = {}
+    try:
+        entries = os.listdir(PROC_ROOT)
+    except OSError:
+        return pids
+    for e in entries:
+        if not e.isdigit():
+            continue
+        comm = (_read(f"{PROC_ROOT}/{e}/comm") or "").strip()
+        if comm in names:
+            pids[int(e)] = comm
+    return pids
+
+
+def _nofile(pid: int) -> int | None:
+    for line in (_read(f"{PROC_ROOT}/{pid}/limits") or "").splitlines():
+        if line.startswith("Max open files"):
+            return _int_or_none(line.split()[3])
+    return None
+
+
+def _cgroup_path(pid: int) -> str | None:
+    for line in (_read(f"{PROC_ROOT}/{pid}/cgroup") or "").splitlines():
+        if line.startswith("0::"):
+            return line[3:].strip()
+    return None
+
+
+def _rss_kb(status: str) -> int:
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+
+def _sample_local(pids: dict[int, str], cgroups: dict[int, str | None]) -> Sample:
+    up = _read(f"{PROC_ROOT}/uptime") or "0"
+    s = Sample(float(up.split()[0]))
+    for pid, comm in pids.items():
+        stat = _read(f"{PROC_ROOT}/{pid}/stat")
+        status = _read(f"{PROC_ROOT}/{pid}/status")
+        if stat is None or status is None:
+            continue  # process exited between samples
+        try:
+            fds = len(os.listdir(f"{PROC_ROOT}/{pid}/fd"))
+        except OSError:
+            fds = 0
+        s.procs[pid] = ProcSample(comm, _stat_ticks(stat), _rss_kb(status), fds, cgroups[pid])
+    for cg in {c for c in cgroups.values() if c is not None}:
+        base = f"{CGROUP_ROOT}{cg.rstrip('/')}"
+        s.cgroups[cg] = CgroupSample(
+            _int_or_none(_read(f"{base}/memory.current")),
+            _int_or_none(_read(f"{base}/memory.max")),
+            _cpu_usec(_read(f"{base}/cpu.stat") or ""),
+        )
+    return s
+
+
+def sample_local(count: int, interval_s: float = SAMPLE_INTERVAL_S) -> Samples:
+    pids = _find_pids(DS_PROCESSES)
+    res = Samples(os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100)
+    res.nofile = {pid: n for pid in pids if (n := _nofile(pid)) is not None}
+    cgroups = {pid: _cgroup_path(pid) for pid in pids}
+    for i in range(count):
+        if i:
+            time.sleep(interval_s)
+        res.samples.append(_sample_local(pids, cgroups))
+    return res
+
+
+# POSIX sh, builtins only inside the sampling loop so one exec covers all samples.
+_SAMPLER_SH = r"""
+echo "@K $(getconf CLK_TCK 2>/dev/null || echo 100)"
+pids=""
+for d in $PROC/[0-9]*; do
+  { read c < $d/comm; } 2>/dev/null || continue
+  case " $NAMES " in *" $c "*) ;; *) continue;; esac
+  p=${d#$PROC/}
+  pids="$pids $p"
+  { while read a b c s _; do
+      [ "$a $b $c" = "Max open files" ] && echo "@L $p $s" && break
+    done < $d/limits; } 2>/dev/null
+done
+i=0
+while [ $i -lt $COUNT ]; do
+  [ $i -gt 0 ] && sleep $INTERVAL
+  read up _ < $PROC/uptime
+  echo "@S $up"
+  gs=""
+  for p in $pids; do
+    d=$PROC/$p
+    { read c < $d/comm && read st < $d/stat; } 2>/dev/null || continue
+    g=""
+    { while read l; do
+        case "$l" in 0::*) g=${l#0::}; break;; esac
+      done < $d/cgroup; } 2>/dev/null
+    rss=0
+    { while read k v _; do [ "$k" = "VmRSS:" ] && rss=$v && break; done < $d/status; } 2>/dev/null
+    set -- $d/fd/*
+    [ -e "$1" ] || set --
+    echo "@P $p $c $rss $# ${g:--}"
+    echo "@T $p $st"
+    [ -n "$g" ] && case " $gs " in *" $g "*) ;; *) gs="$gs $g";; esac
+  done
+  for g in $gs; do
+    b=$ROOT${g%/}
+    mc=""; mm=""; cu=""
+    { read mc < $b/memory.current; } 2>/dev/null
+    { read mm < $b/memory.max; } 2>/dev/null
+    { while read k v; do [ "$k" = usage_usec ] && cu=$v && break; done < $b/cpu.stat; } 2>/dev/null
+    echo "@C $g ${mc:--} ${mm:--} ${cu:--}"
+  done
+  i=$((i+1))
+done
+"""
+
+
+def parse_samples(text: str) -> Samples:
+    res = Samples(100)
+    pending: dict[int, tuple[str, int, int, str | None]] = {}
+    cur: Sample | None = None
+    for line in text.splitlines():
+        tag, _, rest = line.partition(" ")
+        if tag == "@K":
+            res.clk_tck = _int_or_none(rest) or 100
+        elif tag == "@L":
+            pid, lim = rest.split(" ", 1)
+            if (n := _int_or_none(lim)) is not None:
+                res.nofile[int(pid)] = n
+        elif tag == "@S":
+            cur = Sample(float(rest.split()[0]))
+            res.samples.append(cur)
+        elif tag == "@P" and cur is not None:
+            pid, comm, rss, fds, cg = rest.split(" ")
+            pending[int(pid)] = (comm, int(rss or 0), int(fds), None if cg == "-" else cg)
+        elif tag == "@T" and cur is not None:
+            pid, stat = rest.split(" ", 1)
+            comm, rss, fds, cg = pending.pop(int(pid))
+            cur.procs[int(pid)] = ProcSample(comm, _stat_ticks(stat), rss, fds, cg)
+        elif tag == "@C" and cur is not None:
+            cg, mc, mm, cu = rest.split(" ")
+            cur.cgroups[cg] = CgroupSample(_int_or_none(mc), _int_or_none(mm), _int_or_none(cu))
+    return res
+
+
+def sample_container(
+    backend: Backend, target: str, count: int, interval_s: float = SAMPLE_INTERVAL_S
+) -> tuple[Samples | None, str]:
+    script = (
+        f"NAMES='{' '.join(DS_PROCESSES)}' COUNT={int(count)} INTERVAL={interval_s}"
+        f" PROC={PROC_ROOT} ROOT={CGROUP_ROOT}" + _SAMPLER_SH
+    )
+    r = backend.exec(target, script, timeout_s=int(count * interval_s) + 15)
+    if r.rc != 0 or "@S" not in r.out:
+        return None, r.err or r.out or f"rc={r.rc}"
+    return parse_samples(r.out), ""
+
+
+def _stats(values: list[float]) -> dict[str, float] | None:
+    if not values:
+        return None
+    return {"mean": round(fmean(values), 2), "max": round(max(values), 2)}
+
+
+def summarize(samples: Samples) -> dict[str, Any]:
+    """Per-program CPU %, RSS and fd usage plus per-cgroup memory/CPU over the sampled window."""
+    ss = samples.samples
+    out: dict[str, Any] = {"samples": len(ss), "window_s": round(ss[-1].uptime - ss[0].uptime, 3) if ss else 0.0}
+
+    programs: dict[str, Any] = {}
+    for name in sorted({p.comm for s in ss for p in s.procs.values()}):
+        rss = [sum(p.rss_kb for p in s.procs.values() if p.comm == name) / 1024 for s in ss]
+        fds = [float(sum(p.fds for p in s.procs.values() if p.comm == name)) for s in ss]
+        cpu: list[float] = []
+        for prev, cur in pairwise(ss):
+            dt = cur.uptime - prev.uptime
+            if dt <= 0:
+                continue
+            ticks = sum(
+                p.ticks - prev.procs[pid].ticks
+                for pid, p in cur.procs.items()
+                if p.comm == name and pid in prev.procs
+            )
+            cpu.append(100.0 * ticks / samples.clk_tck / dt)
+        # fd limits are per process; compare the busiest process against its own limit
+        ratios = [
+            p.fds / samples.nofile[pid]
+            for s in ss
+            for pid, p in s.procs.items()
+            if p.comm == name and samples.nofile.get(pid)
+        ]
+        programs[name] = {
+            "processes": max(sum(1 for p in s.procs.values() if p.comm == name) for s in ss),
+            "cpu_pct": _stats(cpu),
+            "rss_mb": _stats(rss),
+            "fds": _stats(fds),
+            "fd_limit": min((samples.nofile[pid] for s in ss for pid, p in s.procs.items()
+                             if p.comm == name and pid in samples.nofile), default=None),
+            "fd_usage_max": round(max(ratios), 3) if ratios else None,
+        }
+    out["programs"] = programs
+
+    cgroups: dict[str, Any] = {}
+    for cg in sorted({c for s in ss for c in s.cgroups}):
+        seq = [s.cgroups[cg] for s in ss if cg in s.cgroups]
+        ups = [s.uptime for s in ss if cg in s.cgroups]
+        mem = [c.mem_current / 2**20 for c in seq if c.mem_current is not None]
+        cpu = [
+            100.0 * (b.cpu_usec - a.cpu_usec) / 1e6 / (tb - ta)
+            for (a, ta), (b, tb) in pairwise(zip(seq, ups, strict=True))
+            if a.cpu_usec is not None and b.cpu_usec is not None and tb > ta
+        ]
+        limit = seq[-1].mem_max
+        cgroups[cg] = {
+            "memory_mb": _stats(mem),
+            "memory_limit_mb": round(limit / 2**20, 2) if limit else None,
+            "memory_usage_max": round(max(mem) * 2**20 / limit, 3) if limit and mem else None,
+            "cpu_pct": _stats(cpu),
+        }
+    out["cgroups"] = cgroups
+    return out
+
+
+def add_resource_checks(report: Report, samples: Samples | None, command: str, error: str = "") -> None:
+    if samples is None or not samples.samples:
+        report.add_check(CheckResult("resource_sample", False, command, error or "no samples"))
+        return
+    summary = summarize(samples)
+    report.add_check(CheckResult("resource_sample", True, command, summary))
+
+    for name, p in summary["programs"].items():
+        usage = p["fd_usage_max"]
+        if usage is not None and usage >= FD_WARN_RATIO:
+            report.add_issue(Issue("warn", f"File descriptor usage near limit: {name} ({usage:.0%})",
+                                   "Increase nofile/ulimit before the process hits EMFILE."))
+    for cg, c in summary["cgroups"].items():
+        usage = c["memory_usage_max"]
+        if usage is not None and usage >= MEM_WARN_RATIO:
+            report.add_issue(Issue("warn", f"Memory usage near cgroup limit: {cg} ({usage:.0%})",
+                                   "Raise the memory limit or reduce load; the OOM killer is likely next."))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import http.client
+import os
+import shlex
+import socket
+import time
+import xmlrpc.client
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from dsutil.backends.base import Backend
+from dsutil.core.state import load_state, save_state
+
+SUPERVISOR_SOCKET = "/var/run/supervisor.sock"
+RPC_PATH = "/RPC2"
+
+# A process is in a restart loop when supervisord reports BACKOFF, or when runs
+# of dsutil have seen it start RESTART_LOOP_MIN times within RESTART_WINDOW_S.
+RESTART_STATE = "supervisor_starts.json"
+RESTART_WINDOW_S = 3600
+RESTART_LOOP_MIN = 3
+
+
+class SupervisorRPCError(Exception):
+    pass
+
+
+class Transport(ABC):
+    @abstractmethod
+    def call(self, body: bytes) -> bytes:
+        """POST an XML-RPC request body to supervisord and return the response body."""
+        ...
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout_s: float) -> None:
+        super().__init__("localhost", timeout=timeout_s)
+        self.path = path
+
+    def connect(self) -> None:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(self.timeout)
+        s.connect(self.path)
+        self.sock = s
+
+
+@dataclass(frozen=True)
+class SocketTransport(Transport):
+    """Talks to supervisord's unix socket directly from the dsutil process."""
+
+    path: str = SUPERVISOR_SOCKET
+    timeout_s: float = 5.0
+
+    def call(self, body: bytes) -> bytes:
+        conn = _UnixHTTPConnection(self.path, self.timeout_s)
+        try:
+            conn.request("POST", RPC_PATH, body, {"Content-Type": "text/xml"})
+            resp = conn.getresponse()
+            data = resp.read()
+        except OSError as e:
+            raise SupervisorRPCError(f"{self.path}: {e}") from e
+        except http.client.HTTPException as e:
+            # something other than supervisord's HTTP server answered on the socket
+            raise SupervisorRPCError(f"{self.path}: {type(e).__name__}: {e}") from e
+        finally:
+            conn.close()
+        if resp.status != 200:
+            raise SupervisorRPCError(f"{self.path}: HTTP {resp.status} {resp.reason}")
+        return data
+
+
+@dataclass(frozen=True)
+class ExecTransport(Transport):
+    """Pipes the request through curl inside the target (one exec per call)."""
+
+    backend: Backend
+    target: str
+    path: str = SUPERVISOR_SOCKET
+    timeout_s: int = 10
+
+    def call(self, body: bytes) -> bytes:
+        cmd = (
+            f"curl -sS --fail --max-time {int(self.timeout_s)} --unix-socket {shlex.quote(self.path)} "
+            f"-H 'Content-Type: text/xml' --data-binary {shlex.quote(body.decode('utf-8'))} "
+            f"http://localhost{RPC_PATH}"
+        )
+        r = self.backend.exec(self.target, cmd, timeout_s=self.timeout_s + 5)
+        if r.rc != 0 or not r.out:
+            raise SupervisorRPCError(r.err or r.out or f"rc={r.rc}")
+        return r.out.encode("utf-8")
+
+
+def container_transport(backend: Backend, container: str, inspect: dict) -> Transport:
+    """Prefer the container's socket through /proc/<pid>/root; fall back to exec."""
+    pid = ((inspect.get("State") or {}).get("Pid")) or 0
+    if pid:
+        path = f"/proc/{int(pid)}/root{SUPERVISOR_SOCKET}"
+        if hasattr(socket, "AF_UNIX") and os.path.exists(path):
+            return SocketTransport(path)
+    return ExecTransport(backend, container)
+
+
+def get_all_process_info(transport: Transport) -> list[dict[str, Any]]:
+    body = xmlrpc.client.dumps((), "supervisor.getAllProcessInfo").encode("utf-8")
+    data = transport.call(body)
+    try:
+        (result,), _ = xmlrpc.client.loads(data)
+    except xmlrpc.client.Fault as e:
+        raise SupervisorRPCError(f"fault {e.faultCode}: {e.faultString}") from e
+    except Exception as e:
+        raise SupervisorRPCError(f"invalid XML-RPC response: {e}") from e
+    if not isinstance(result, list):
+        raise SupervisorRPCError("unexpected getAllProcessInfo result")
+    return result
+
+
+def _program_state(info: dict[str, Any]) -> dict[str, Any]:
+    state = str(info.get("statename", "UNKNOWN"))
+    start = int(info.get("start") or 0)
+    stop = int(info.get("stop") or 0)
+    now = int(info.get("now") or time.time())
+    uptime = now - start if state == "RUNNING" and start else None
+    return {
+        "state": state,
+        "pid": int(info.get("pid") or 0) or None,
+        "start": start or None,
+        "stop": stop or None,
+        "uptime_s": uptime,
+        "exitstatus": info.get("exitstatus"),
+        "spawnerr": info.get("spawnerr") or None,
+        "restart_loop": state == "BACKOFF",
+        "recent_starts": None,
+        "rest": str(info.get("description", "")),
+    }
+
+
+def probe_supervisor(transport: Transport, programs: Iterable[str] | None = None) -> dict[str, dict[str, Any]]:
+    """Structured supervisord state keyed by "group:name" (or "name" for single-process groups)."""
+    wanted = set(programs) if programs is not None else None
+    res: dict[str, dict[str, Any]] = {}
+    for info in get_all_process_info(transport):
+        name, group = str(info.get("name", "")), str(info.get("group", ""))
+        full = name if not group or group == name else f"{group}:{name}"
+        if wanted is not None and full not in wanted:
+            continue
+        res[full] = _program_state(info)
+    return res
+
+
+def track_restarts(sup: dict[str, dict[str, Any]], key: str, now: float | None = None) -> None:
+    """Flag restart loops from start times remembered across runs (updates `sup` in place)."""
+    now = time.time() if now is None else now
+    data = load_state(RESTART_STATE)
+    data = data if isinstance(data, dict) else {}
+    seen = data.get(key) if isinstance(data.get(key), dict) else {}
+    kept: dict[str, list[int]] = {}
+    for name, st in sup.items():
+        starts = [int(t) for t in seen.get(name) or [] if now - int(t) < RESTART_WINDOW_S]
+        if st.get("start") and st["start"] not in starts and now - st["start"] < RESTART_WINDOW_S:
+            starts.append(st["start"])
+        st["recent_starts"] = len(starts)
+        if len(starts) >= RESTART_LOOP_MIN:
+            st["restart_loop"] = True
+        if starts:
+            kept[name] = sorted(starts)
+    data[key] = kept
+    save_state(RESTART_STATE, data)
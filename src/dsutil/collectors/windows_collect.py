@@ -5,9 +5,11 @@ from pathlib import Path
 
 from dsutil.backends.base import Backend
 from dsutil.backends.windows import WindowsBackend
+from dsutil.core.baseline import BaselineStore
 from dsutil.core.models import CheckResult, Issue, Report
 from dsutil.core.report import finalize
 from dsutil.core.rules import default_rules, scan_text
+from dsutil.core.triage import Triage
 
 TARGET_HOST = "host"
 LOG_BASE = Path(r"C:\Program Files\ONLYOFFICE\DocumentServer\Log")
@@ -56,14 +58,18 @@ def _tail_file(backend: Backend, target: str, path: Path, lines: int) -> tuple[b
     return exists, (r.out or "").strip()
 
 
-def collect_windows_report(file_tail: int = 800) -> Report:
+def collect_windows_report(file_tail: int = 800, triage: Triage | None = None) -> Report:
     ts = datetime.now(timezone.utc).isoformat()
     report = Report(tool="dsutil", timestamp_utc=ts, platform="windows", target=TARGET_HOST)
 
+    triage = triage or Triage()
+
+    # tier: backend and health endpoint
     backend = WindowsBackend()
     ok, info = backend.check_available()
     if not ok:
         report.add_issue(Issue("crit", "Windows backend is not available", info))
+        triage.stop(report, "state")
         return finalize(report)
 
     # Health endpoint
@@ -84,8 +90,11 @@ def collect_windows_report(file_tail: int = 800) -> Report:
         )
     )
     if not ok_health:
-        report.add_issue(Issue("crit", "Health endpoint check failed", "Check nginx/docservice/converter status and logs."))
+        report.add_issue(triage.symptom(Issue("crit", "Health endpoint check failed", "Check nginx/docservice/converter status and logs.")))
+    if triage.stop(report, "state"):
+        return finalize(report)
 
+    # tier: services
     # Required services
     for svc in REQUIRED_SERVICES:
         ok_svc, status = _service_status(backend, TARGET_HOST, svc)
@@ -99,7 +108,10 @@ def collect_windows_report(file_tail: int = 800) -> Report:
         report.add_check(CheckResult(f"service_{svc}", ok_svc, f"Get-Service {svc}", status))
         if not ok_svc:
             report.add_issue(Issue("warn", f"Optional service not running: {svc}", "This service is optional; enable if needed."))
+    if triage.stop(report, "services"):
+        return finalize(report)
 
+    # tier: dependencies
     # Dependency services
     for svc in DEPENDENCY_SERVICES:
         ok_svc, status = _service_status(backend, TARGET_HOST, svc)
@@ -109,13 +121,20 @@ def collect_windows_report(file_tail: int = 800) -> Report:
                 report.add_issue(Issue("warn", f"Dependency service missing: {svc}", "Service is not installed; install it if required by your configuration."))
             else:
                 report.add_issue(Issue("crit", f"Dependency service not running: {svc}", "Ensure the service is installed and running."))
+    if triage.stop(report, "dependencies"):
+        return finalize(report)
 
-    # Logs scan
+    # tier: logs
+    # Logs scan; rate rules compare against per-source baselines
     rules = default_rules()
+    baselines = BaselineStore()
     for path in LOG_TARGETS:
         exists, content = _tail_file(backend, TARGET_HOST, path, file_tail)
         if exists and content:
-            for i in scan_text(content, rules):
+            for i in scan_text(content, rules, baselines, f"{TARGET_HOST}:{path}"):
                 report.add_issue(i)
+    report.add_check(CheckResult("log_rates", True, "hits/min vs baseline", baselines.observed))
+    baselines.save()
+    triage.stop(report, "logs")
 
     return finalize(report)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from .state import load_state, save_state
+
+BASELINE_STATE = "baselines.json"
+
+ALPHA = 0.2           # EWMA weight of the newest observation
+DEVIANT_ALPHA = 0.02  # ...of one that deviates (only the mean drifts, the variance is kept)
+MIN_RUNS = 5          # observations before the baseline is trusted
+DEVIATION_K = 3.0     # std deviations above the mean that count as a deviation
+MIN_MARGIN = 0.5      # ...but never less than 50% above the mean
+
+
+class BaselineStore:
+    """Rolling EWMA mean/variance of hits per minute, per target/source and rule.
+
+    Stored as {key: {rule_id: [mean, var, n]}} in the state directory.
+    """
+
+    def __init__(self, name: str = BASELINE_STATE) -> None:
+        self.name = name
+        loaded = load_state(name)
+        self._data: dict[str, dict[str, list[float]]] = loaded if isinstance(loaded, dict) else {}
+        self.observed: dict[str, dict[str, Any]] = {}
+
+    def observe(self, key: str, rule_id: str, rate: float, threshold: float) -> bool:
+        """Record a rate; True if it reaches the threshold and deviates from the baseline."""
+        entry = self._data.setdefault(key, {}).get(rule_id)
+        mean, var, n = entry if entry else (0.0, 0.0, 0)
+
+        if rate < threshold:
+            fire = False
+        elif n < MIN_RUNS:
+            fire = True
+        else:
+            fire = rate > mean + max(DEVIATION_K * math.sqrt(var), MIN_MARGIN * mean)
+
+        if rate > 0:
+            self.observed.setdefault(key, {})[rule_id] = {
+                "per_min": round(rate, 3),
+                "baseline": round(mean, 3) if n else None,
+                "deviates": fire,
+            }
+
+        if fire and n >= MIN_RUNS:
+            # a storm must not teach the baseline that storms are normal: it only
+            # drifts the mean, so it stays reported while it lasts
+            mean += DEVIANT_ALPHA * (rate - mean)
+        elif n:
+            diff = rate - mean
+            incr = ALPHA * diff
+            mean += incr
+            var = (1 - ALPHA) * (var + diff * incr)
+        else:
+            mean, var = rate, 0.0
+        self._data[key][rule_id] = [round(mean, 4), round(var, 4), min(int(n) + 1, MIN_RUNS)]
+        return fire
+
+    def save(self) -> None:
+        save_state(self.name, self._data)
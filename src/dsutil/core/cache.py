@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Callable, Iterable
+
+from .state import load_state, save_state
+
+CACHE_STATE = "cache.json"
+
+
+def file_key(paths: Iterable[str | os.PathLike[str]]) -> list[list[Any]]:
+    """Validation key for files/dirs: inode, mtime and size (None if missing)."""
+    key: list[list[Any]] = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            key.append([str(p), st.st_ino, st.st_mtime_ns, st.st_size])
+        except OSError:
+            key.append([str(p), None])
+    return key
+
+
+def _norm(key: Any) -> Any:
+    # keys are compared after a JSON round trip (tuples become lists, etc.)
+    return json.loads(json.dumps(key))
+
+
+class ResultCache:
+    """On-disk cache of slow-changing check results.
+
+    An entry is reused only while its TTL has not expired and its validation key
+    (file stats, container ID + StartedAt, ...) still matches. Values must be JSON
+    serializable and must not contain secrets: the file lives in the state dir.
+    """
+
+    def __init__(self, enabled: bool = True, name: str = CACHE_STATE) -> None:
+        self.enabled = enabled
+        self.name = name
+        loaded = load_state(name) if enabled else None
+        self._entries: dict[str, Any] = loaded if isinstance(loaded, dict) else {}
+        self._dirty = False
+
+    def get(self, check: str, key: Any) -> Any | None:
+        if not self.enabled:
+            return None
+        e = self._entries.get(check)
+        if not e or e.get("expires", 0) < time.time() or e.get("key") != _norm(key):
+            return None
+        return e.get("value")
+
+    def peek(self, check: str) -> Any | None:
+        """Last stored value regardless of TTL/key (e.g. to derive the key itself)."""
+        e = self._entries.get(check) if self.enabled else None
+        return e.get("value") if e else None
+
+    def put(self, check: str, key: Any, value: Any, ttl_s: float) -> None:
+        if not self.enabled:
+            return
+        self._entries[check] = {"key": _norm(key), "expires": time.time() + ttl_s, "value": value}
+        self._dirty = True
+
+    def cached(
+        self,
+        check: str,
+        key: Any,
+        ttl_s: float,
+        fn: Callable[[], Any],
+        keep: Callable[[Any], bool] | None = None,
+    ) -> tuple[Any, bool]:
+        """Return (value, from_cache); runs fn() on a miss and stores it unless keep() rejects it."""
+        hit = self.get(check, key)
+        if hit is not None:
+            return hit, True
+        value = fn()
+        if keep is None or keep(value):
+            self.put(check, key, value, ttl_s)
+        return value, False
+
+    def save(self) -> None:
+        if not (self.enabled and self._dirty):
+            return
+        now = time.time()
+        live = {k: e for k, e in self._entries.items() if e.get("expires", 0) >= now}
+        save_state(self.name, live)
+        self._dirty = False
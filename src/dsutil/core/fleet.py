@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .models import CheckResult, Issue, Report, Severity, report_from_dict, report_to_dict
+from .rules import default_rules
+
+PREVIEW_CHARS = 400
+
+# status column values: bit 0 = check present, bit 1 = ok, bit 2 = cached
+_PRESENT, _OK, _CACHED = 1, 2, 4
+_SEVERITIES: tuple[Severity, ...] = ("info", "warn", "crit")
+_SEV_CODE = {s: i for i, s in enumerate(_SEVERITIES)}
+_ZEROS = array("I", [0])
+
+
+def _text(output: Any) -> str:
+    return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False, default=str)
+
+
+class OutputView:
+    """Check output: held as is, or (when large and reloadable) only as a short preview.
+
+    A held value is stored once; its preview is derived on demand.
+    """
+
+    __slots__ = ("size", "_value", "_load")
+
+    def __init__(self, size: int, value: Any, load: Callable[[], Any] | None = None) -> None:
+        self.size = size
+        self._value = value  # the preview string when `load` is set
+        self._load = load
+
+    @property
+    def truncated(self) -> bool:
+        return self._load is not None
+
+    @property
+    def preview(self) -> str:
+        return self._value if self._load is not None else _text(self._value)[:PREVIEW_CHARS]
+
+    def load(self) -> Any:
+        return self._load() if self._load is not None else self._value
+
+    def __repr__(self) -> str:
+        return f"OutputView({self._value[:40]!r}..., size={self.size})" if self.truncated else repr(self._value)
+
+
+def _view(output: Any, load: Callable[[], Any] | None) -> OutputView | None:
+    if output is None:
+        return None
+    text = _text(output)
+    if len(text) <= PREVIEW_CHARS or load is None:
+        # small outputs (and outputs that could not be reloaded) are kept as they are
+        if isinstance(output, str) and len(output) < 64:
+            output = sys.intern(output)
+        return OutputView(len(text), output)
+    return OutputView(len(text), text[:PREVIEW_CHARS], load)
+
+
+def _output_of(report: Report, pos: int, name: str) -> Any:
+    checks = report.checks
+    if pos < len(checks) and checks[pos].name == name:
+        return checks[pos].output
+    return next((c.output for c in checks if c.name == name), None)
+
+
+class FleetTable:
+    """Columnar aggregate of many reports (one row per report).
+
+    Check status and command are one column per check name; each row keeps the
+    order of its checks and its issues as small index arrays. Strings are
+    interned once: targets, check names, commands, and (severity, title, hint,
+    rule) issue keys whose strings are shared with the log rules. Adding or
+    merging rows costs O(rows x checks), rebuilding a row O(checks + issues).
+    """
+
+    __slots__ = (
+        "targets", "_tidx", "row_target", "row_meta", "row_order", "row_issues", "row_loader", "row_triage",
+        "checks", "_cidx", "status", "command",
+        "commands", "_cmdidx", "outputs",
+        "issue_keys", "_iidx", "_rules",
+    )
+
+    def __init__(self) -> None:
+        self.targets: list[str] = []
+        self._tidx: dict[str, int] = {}
+        self.row_target = array("I")
+        self.row_meta: list[tuple[str, str, str]] = []  # (tool, timestamp_utc, platform)
+        self.row_order: list[array] = []  # check indices in report order
+        self.row_issues: list[array] = []  # issue key indices in report order
+        self.row_loader: list[Callable[[], Report] | None] = []
+        self.row_triage: list[tuple[tuple[str, ...], tuple[str, ...]] | None] = []  # (not_run, root_cause)
+
+        self.checks: list[str] = []
+        self._cidx: dict[str, int] = {}
+        self.status: list[bytearray] = []
+        self.command: list[array] = []  # per check: index into `commands` for each row
+
+        self.commands: list[str] = []
+        self._cmdidx: dict[str, int] = {}
+        self.outputs: dict[tuple[int, int], OutputView] = {}
+
+        self.issue_keys: list[tuple[int, str, str, str | None]] = []
+        self._iidx: dict[tuple[int, str, str, str | None], int] = {}
+        self._rules = {r.title: r for r in default_rules()}
+
+    def __len__(self) -> int:
+        return len(self.row_target)
+
+    def _target(self, name: str) -> int:
+        i = self._tidx.get(name)
+        if i is None:
+            i = self._tidx[name] = len(self.targets)
+            self.targets.append(sys.intern(name))
+        return i
+
+    def _check(self, name: str) -> int:
+        i = self._cidx.get(name)
+        if i is None:
+            i = self._cidx[name] = len(self.checks)
+            self.checks.append(sys.intern(name))
+            self.status.append(bytearray(len(self)))
+            self.command.append(_ZEROS * len(self))
+        return i
+
+    def _command(self, command: str) -> int:
+        i = self._cmdidx.get(command)
+        if i is None:
+            i = self._cmdidx[command] = len(self.commands)
+            self.commands.append(sys.intern(command))
+        return i
+
+    def _issue(self, issue: Issue) -> int:
+        rule = self._rules.get(issue.title)
+        if rule is not None and issue.hint == rule.hint and issue.rule in (None, rule.id):
+            key = (_SEV_CODE[issue.severity], rule.title, rule.hint, rule.id)
+        else:
+            key = (_SEV_CODE[issue.severity], sys.intern(issue.title), sys.intern(issue.hint), issue.rule)
+        i = self._iidx.get(key)
+        if i is None:
+            i = self._iidx[key] = len(self.issue_keys)
+            self.issue_keys.append(key)
+        return i
+
+    def add(self, report: Report, loader: Callable[[], Report] | None = None) -> int:
+        """Append a report as a new row.
+
+        With a `loader` that re-reads the report, large outputs are kept only as
+        previews and reloaded when a full row is requested; without one they are
+        kept in full.
+        """
+        row = len(self)
+        self.row_target.append(self._target(report.target))
+        self.row_meta.append((sys.intern(report.tool), report.timestamp_utc, sys.intern(report.platform)))
+        self.row_loader.append(loader)
+        self.row_triage.append(
+            (tuple(map(sys.intern, report.not_run)), tuple(map(sys.intern, report.root_cause)))
+            if report.not_run or report.root_cause else None
+        )
+        for col, cmd in zip(self.status, self.command, strict=True):
+            col.append(0)
+            cmd.append(0)
+        order = array("I")
+        for pos, c in enumerate(report.checks):
+            ci = self._check(c.name)
+            order.append(ci)
+            self.status[ci][row] = _PRESENT | (_OK if c.ok else 0) | (_CACHED if c.cached else 0)
+            self.command[ci][row] = self._command(c.command)
+            load = None if loader is None else (lambda pos=pos, name=c.name: _output_of(loader(), pos, name))
+            v = _view(c.output, load)
+            if v is not None:
+                self.outputs[(row, ci)] = v
+        self.row_order.append(order)
+        self.row_issues.append(array("I", (self._issue(i) for i in report.issues)))
+        return row
+
+    def add_file(self, path: str | Path) -> int:
+        """Add a report saved as JSON (the `--json` schema); large outputs reload from the file."""
+        p = Path(path)
+        report = report_from_dict(json.loads(p.read_text(encoding="utf-8")))
+        return self.add(report, lambda: report_from_dict(json.loads(p.read_text(encoding="utf-8"))))
+
+    def merge(self, other: FleetTable) -> None:
+        """Append all rows of another table, column by column."""
+        base = len(self)
+        n = len(other)
+        tmap = [self._target(t) for t in other.targets]
+        self.row_target.extend(tmap[t] for t in other.row_target)
+        self.row_meta.extend(other.row_meta)
+        self.row_loader.extend(other.row_loader)
+        self.row_triage.extend(other.row_triage)
+
+        cmap = [self._check(name) for name in other.checks]
+        cmdmap = array("I", (self._command(c) for c in other.commands))
+        filled = set(cmap)
+        for ci, (col, cmd) in enumerate(zip(self.status, self.command, strict=True)):
+            if ci not in filled:
+                col.extend(bytes(n))
+                cmd.extend(_ZEROS * n)
+        for oci, ci in enumerate(cmap):
+            col, cmd = self.status[ci], self.command[ci]
+            # columns created by _check() above already cover the new rows
+            del col[base:], cmd[base:]
+            col.extend(other.status[oci])
+            cmd.extend(cmdmap[i] for i in other.command[oci])
+        for (row, oci), v in other.outputs.items():
+            self.outputs[(base + row, cmap[oci])] = v
+
+        imap = [self._issue(Issue(_SEVERITIES[k[0]], k[1], k[2], k[3])) for k in other.issue_keys]
+        self.row_order.extend(array("I", (cmap[c] for c in order)) for order in other.row_order)
+        self.row_issues.extend(array("I", (imap[k] for k in issues)) for issues in other.row_issues)
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        """Per check: how many rows passed, failed, or did not run it."""
+        out: dict[str, dict[str, int]] = {}
+        for name, col in zip(self.checks, self.status, strict=True):
+            ok = col.count(_PRESENT | _OK) + col.count(_PRESENT | _OK | _CACHED)
+            not_run = col.count(0)
+            out[name] = {"ok": ok, "fail": len(col) - ok - not_run, "not_run": not_run}
+        return out
+
+    def failing(self, check: str) -> list[str]:
+        ci = self._cidx.get(check)
+        if ci is None:
+            return []
+        col = self.status[ci]
+        return [self.targets[self.row_target[r]] for r in range(len(col)) if col[r] & (_PRESENT | _OK) == _PRESENT]
+
+    def report(self, row: int, full_output: bool = True) -> Report:
+        """Rebuild one row as a Report; full_output=False keeps large outputs as previews."""
+        tool, ts, platform = self.row_meta[row]
+        report = Report(tool, ts, platform, self.targets[self.row_target[row]])
+        full: Report | None = None
+        reloaded = False
+        for pos, ci in enumerate(self.row_order[row]):
+            st = self.status[ci][row]
+            v = self.outputs.get((row, ci))
+            if v is None:
+                output = None
+            elif not v.truncated:
+                output = v.load()
+            elif not full_output:
+                output = v.preview
+            else:
+                # one reload per row, however many outputs were truncated
+                if not reloaded:
+                    full, reloaded = self._reload(row), True
+                output = _output_of(full, pos, self.checks[ci]) if full is not None else v.preview
+            report.add_check(CheckResult(
+                self.checks[ci], bool(st & _OK), self.commands[self.command[ci][row]], output, bool(st & _CACHED),
+            ))
+        for k in self.row_issues[row]:
+            sev, title, hint, rule = self.issue_keys[k]
+            report.add_issue(Issue(_SEVERITIES[sev], title, hint, rule))
+        triage = self.row_triage[row]
+        if triage is not None:
+            report.not_run, report.root_cause = list(triage[0]), list(triage[1])
+        return report
+
+    def _reload(self, row: int) -> Report | None:
+        loader = self.row_loader[row]
+        try:
+            return loader() if loader is not None else None
+        except (OSError, ValueError):
+            # source file gone or rewritten: previews are all that is left
+            return None
+
+    def to_dicts(self, rows: Iterable[int] | None = None) -> list[dict[str, Any]]:
+        """Compatibility view: rows in the regular JSON report schema."""
+        return [report_to_dict(self.report(r)) for r in (range(len(self)) if rows is None else rows)]
@@ -1,27 +1,30 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Literal, Optional
+from typing import Any, Literal
 
 Severity = Literal["info", "warn", "crit"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Issue:
     severity: Severity
     title: str
     hint: str
+    # id of the log rule that produced it; title/hint are then the rule's own strings
+    rule: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CheckResult:
     name: str
     ok: bool
     command: str
     output: Any = None
+    cached: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Report:
     tool: str
     timestamp_utc: str
@@ -30,9 +33,40 @@ class Report:
 
     checks: list[CheckResult] = field(default_factory=list)
     issues: list[Issue] = field(default_factory=list)
+    # --triage only: tiers skipped after an early exit, and the symptom -> cause chain
+    not_run: list[str] = field(default_factory=list)
+    root_cause: list[str] = field(default_factory=list)
 
     def add_check(self, check: CheckResult) -> None:
         self.checks.append(check)
 
     def add_issue(self, issue: Issue) -> None:
         self.issues.append(issue)
+
+
+def report_to_dict(report: Report) -> dict[str, Any]:
+    """The JSON report schema; builds plain dicts directly instead of deep-copying via asdict()."""
+    return {
+        "tool": report.tool,
+        "timestamp_utc": report.timestamp_utc,
+        "platform": report.platform,
+        "target": report.target,
+        "checks": [
+            {"name": c.name, "ok": c.ok, "command": c.command, "output": c.output, "cached": c.cached}
+            for c in report.checks
+        ],
+        "issues": [{"severity": i.severity, "title": i.title, "hint": i.hint} for i in report.issues],
+        "not_run": list(report.not_run),
+        "root_cause": list(report.root_cause),
+    }
+
+
+def report_from_dict(d: dict[str, Any]) -> Report:
+    report = Report(str(d.get("tool", "")), str(d.get("timestamp_utc", "")), str(d.get("platform", "")), str(d.get("target", "")))
+    for c in d.get("checks") or []:
+        report.add_check(CheckResult(c["name"], bool(c["ok"]), c.get("command", ""), c.get("output"), bool(c.get("cached", False))))
+    for i in d.get("issues") or []:
+        report.add_issue(Issue(i["severity"], i["title"], i["hint"]))
+    report.not_run = list(d.get("not_run") or [])
+    report.root_cause = list(d.get("root_cause") or [])
+    return report
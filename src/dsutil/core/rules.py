@@ -2,50 +2,154 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Iterable, Pattern
+from datetime import datetime
+from typing import Any, Iterable, Pattern
 
+from .baseline import BaselineStore
 from .models import Issue, Severity
 
+# Leading timestamps of DS logs ("[2024-01-15T10:20:30.123]") and nginx error logs ("2024/01/15 10:20:30")
+_LINE_TS = re.compile(r"^\[?(\d{4})[-/](\d\d)[-/](\d\d)[T ](\d\d):(\d\d):(\d\d)", re.MULTILINE)
+_TS_PROBE_LINES = 50
+
 
 @dataclass(frozen=True)
 class Rule:
+    id: str
     pattern: Pattern[str]
     severity: Severity
     title: str
     hint: str
+    # None: fire on presence. Otherwise fire at >= this many hits per minute, and
+    # only when the rate deviates from the stored baseline (if one is given).
+    rate_per_min: float | None = None
 
 
 def default_rules() -> list[Rule]:
-    def r(p: str, sev: Severity, title: str, hint: str) -> Rule:
-        return Rule(re.compile(p, re.IGNORECASE), sev, title, hint)
+    def r(rid: str, p: str, sev: Severity, title: str, hint: str, rate: float | None = None) -> Rule:
+        return Rule(rid, re.compile(p, re.IGNORECASE), sev, title, hint, rate)
 
     return [
-        r(r"\b502\b|\b504\b", "warn", "HTTP gateway errors detected",
-          "Often means upstream (internal DS service) is down or timing out."),
-        r(r"upstream timed out|proxy_read_timeout|timeout", "warn", "Timeouts detected",
-          "Check CPU/IO pressure; consider increasing nginx timeouts if needed."),
-        r(r"connect\(\) failed \(111|Connection refused", "crit", "Connection refused detected",
+        r("http_gateway", r"\b502\b|\b504\b", "warn", "HTTP gateway errors detected",
+          "Often means upstream (internal DS service) is down or timing out.", rate=5),
+        r("timeout", r"upstream timed out|proxy_read_timeout|timeout", "warn", "Timeouts detected",
+          "Check CPU/IO pressure; consider increasing nginx timeouts if needed.", rate=5),
+        r("conn_refused", r"connect\(\) failed \(111|Connection refused", "crit", "Connection refused detected",
           "Usually the target service/port is not listening or crashed."),
-        r(r"OOMKilled|Out of memory|Killed process", "crit", "Possible OOM condition",
+        r("oom", r"OOMKilled|Out of memory|Killed process", "crit", "Possible OOM condition",
           "Likely memory pressure or container memory limits; review memory usage/limits."),
-        r(r"too many open files|EMFILE", "crit", "File descriptor limit reached",
+        r("emfile", r"too many open files|EMFILE", "crit", "File descriptor limit reached",
           "Increase nofile/ulimit; otherwise services can fail under load."),
-        r(r"(password authentication failed|could not connect to server|connection refused|FATAL:\s)", "warn",
+        r("postgres", r"(password authentication failed|could not connect to server|connection refused|FATAL:\s)", "warn",
           "PostgreSQL connectivity/auth errors detected",
           "Check PostgreSQL is running, credentials, and local connectivity."),
-        r(r"(AMQP.*(ACCESS_REFUSED|NOT_ALLOWED)|ECONNREFUSED|Connection refused).*amqp|amqp.*(ACCESS_REFUSED|NOT_ALLOWED|ECONNREFUSED)", "warn",
+        r("rabbitmq", r"(AMQP.*(ACCESS_REFUSED|NOT_ALLOWED)|ECONNREFUSED|Connection refused).*amqp|amqp.*(ACCESS_REFUSED|NOT_ALLOWED|ECONNREFUSED)", "warn",
           "RabbitMQ connectivity/auth errors detected",
           "Check RabbitMQ is running and AMQP credentials/permissions are correct."),
-        r(r"fontconfig|No fonts|FcConfig|Fontconfig error", "warn", "Fontconfig/fonts issue",
+        r("fonts", r"fontconfig|No fonts|FcConfig|Fontconfig error", "warn", "Fontconfig/fonts issue",
           "Check font volumes (/usr/share/fonts) and font cache; missing fonts can break rendering."),
     ]
 
 
-def scan_text(text: str, rules: Iterable[Rule]) -> list[Issue]:
+def _ts(m: re.Match[str]) -> datetime:
+    y, mo, d, h, mi, sec = (int(g) for g in m.groups())
+    return datetime(y, mo, d, h, mi, sec)
+
+
+def text_span_s(text: str) -> float | None:
+    """Seconds between the first and last timestamped lines of a log excerpt, if any."""
+    first = _LINE_TS.search(text)
+    if first is None:
+        return None
+    last = None
+    end = len(text)
+    for _ in range(_TS_PROBE_LINES):
+        start = text.rfind("\n", 0, end - 1) + 1
+        last = _LINE_TS.match(text, start)
+        if last is not None or start == 0:
+            break
+        end = start
+    if last is None:
+        return None
+    try:
+        return max((_ts(last) - _ts(first)).total_seconds(), 0.0)
+    except ValueError:
+        return None
+
+
+def _rate_fires(
+    rule: Rule, threshold: float, hits: int, span_s: float | None, baselines: BaselineStore | None, key: str
+) -> bool:
+    # without timestamps a scan is treated as one minute of log (dsutil runs from a minutely cron)
+    rate = hits / max((span_s or 0.0) / 60.0, 1.0)
+    if baselines is None:
+        return rate >= threshold
+    return baselines.observe(key, rule.id, rate, threshold)
+
+
+def scan_text(
+    text: str,
+    rules: Iterable[Rule],
+    baselines: BaselineStore | None = None,
+    key: str = "",
+) -> list[Issue]:
     issues: list[Issue] = []
     if not text:
         return issues
+    span_s: float | None = None
+    span_known = False
     for rule in rules:
-        if rule.pattern.search(text):
-            issues.append(Issue(rule.severity, rule.title, rule.hint))
+        if rule.rate_per_min is None:
+            if rule.pattern.search(text):
+                issues.append(Issue(rule.severity, rule.title, rule.hint, rule.id))
+            continue
+        if not span_known:
+            span_s, span_known = text_span_s(text), True
+        hits = sum(1 for _ in rule.pattern.finditer(text))
+        if _rate_fires(rule, rule.rate_per_min, hits, span_s, baselines, key):
+            issues.append(Issue(rule.severity, rule.title, rule.hint, rule.id))
     return issues
+
+
+def scan_entries(
+    entries: Iterable[tuple[datetime, str]],
+    rules: Iterable[Rule],
+    baselines: BaselineStore | None = None,
+    key: str = "",
+) -> tuple[list[Issue], dict[str, Any]]:
+    """Scan timestamped log lines; also returns per-rule hit counts with first/last seen times."""
+    rules = list(rules)
+    hits: dict[str, dict[str, Any]] = {}
+    first: datetime | None = None
+    last: datetime | None = None
+    for ts, text in entries:
+        if first is None:
+            first = ts
+        last = ts
+        if not text:
+            continue
+        for rule in rules:
+            if not rule.pattern.search(text):
+                continue
+            h = hits.get(rule.id)
+            if h is None:
+                hits[rule.id] = {"count": 1, "first": ts, "last": ts}
+            else:
+                h["count"] += 1
+                h["last"] = ts
+
+    span_s = (last - first).total_seconds() if first is not None and last is not None else None
+    issues: list[Issue] = []
+    for rule in rules:
+        if rule.rate_per_min is None:
+            fire = rule.id in hits
+        elif first is None:
+            fire = False
+        else:
+            count = hits[rule.id]["count"] if rule.id in hits else 0
+            fire = _rate_fires(rule, rule.rate_per_min, count, span_s, baselines, key)
+        if fire:
+            issues.append(Issue(rule.severity, rule.title, rule.hint, rule.id))
+    for h in hits.values():
+        h["first"], h["last"] = h["first"].isoformat(), h["last"].isoformat()
+    return issues, hits
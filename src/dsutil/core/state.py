@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def state_dir() -> Path:
+    """Where dsutil keeps data between runs (journal cursor, caches, baselines)."""
+    env = os.environ.get("DSUTIL_STATE_DIR")
+    if env:
+        return Path(env)
+    if os.name == "nt":
+        return Path(os.environ.get("ProgramData", r"C:\ProgramData")) / "dsutil"
+    return Path("/var/lib/dsutil")
+
+
+def load_state(name: str, default: Any = None) -> Any:
+    try:
+        return json.loads((state_dir() / name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def save_state(name: str, data: Any) -> bool:
+    # write-then-rename so a concurrent cron run never reads a half-written file
+    path = state_dir() / name
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+
+_BLOCK = 1 << 16
+
+
+def tail_bytes(path: str | os.PathLike[str], lines: int) -> bytes:
+    """Last `lines` lines of a file, read backwards block by block (raises OSError)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        pos = end
+        chunks: list[bytes] = []
+        newlines = 0
+        # one extra newline: the file usually ends with one
+        while pos > 0 and newlines <= lines:
+            step = min(_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks))
+    if lines <= 0:
+        return b""
+    parts = data.split(b"\n")
+    if parts and parts[-1] == b"":
+        parts.pop()
+    return b"\n".join(parts[-lines:])
+
+
+def tail_file(path: str | os.PathLike[str], lines: int) -> tuple[bool, str]:
+    """(exists, last lines) like `tail -n`; other OSErrors (e.g. permissions) are raised."""
+    try:
+        return True, tail_bytes(path, lines).decode("utf-8", errors="replace")
+    except FileNotFoundError:
+        return False, ""
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from .models import Issue, Report
+
+# checked in this order; --triage stops after the first tier that explains a critical failure
+TIERS = ("state", "services", "dependencies", "logs")
+
+
+class Triage:
+    """Tier bookkeeping for `--triage`.
+
+    Collectors call `stop()` at the end of every tier. Critical issues marked as
+    symptoms (e.g. a failing health endpoint) do not stop the run; they start
+    the root-cause chain that a deeper tier is expected to explain.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._seen = 0
+        self._symptoms: set[str] = set()
+        self._chain: list[str] = []
+
+    def symptom(self, issue: Issue) -> Issue:
+        self._symptoms.add(issue.title)
+        return issue
+
+    def stop(self, report: Report, tier: str) -> bool:
+        """Close `tier`; True if triage is on and the tier found a cause (deeper tiers are skipped)."""
+        new = report.issues[self._seen:]
+        self._seen = len(report.issues)
+        if not self.enabled:
+            return False
+        causes: list[str] = []
+        for i in new:
+            if i.severity != "crit":
+                continue
+            if i.title in self._symptoms:
+                self._chain.append(f"{tier}: {i.title}")
+            elif f"{tier}: {i.title}" not in causes:
+                causes.append(f"{tier}: {i.title}")
+        report.root_cause = self._chain + causes
+        if not causes:
+            return False
+        report.not_run = list(TIERS[TIERS.index(tier) + 1:])
+        return True
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
 
-from dsutil.core.models import Report
+from dsutil.core.fleet import FleetTable
+from dsutil.core.models import Report, report_to_dict
+from dsutil.core.redact import redact_obj
 
 def to_json(report: Report) -> str:
-    return json.dumps(asdict(report), indent=2, ensure_ascii=False)
+    return json.dumps(redact_obj(report_to_dict(report)), indent=2, ensure_ascii=False)
+
+
+def fleet_to_json(table: FleetTable, reports: bool = False) -> str:
+    failing = {c: table.failing(c) for c in table.checks}
+    data = {
+        "reports": len(table),
+        "targets": list(table.targets),
+        "summary": table.summary(),
+        "failing": {c: t for c, t in failing.items() if t},
+    }
+    if reports:
+        data["rows"] = table.to_dicts()
+    return json.dumps(redact_obj(data), indent=2, ensure_ascii=False)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from dsutil.core.fleet import FleetTable
 from dsutil.core.models import Report
+from dsutil.core.redact import redact_text
 
 def print_report(report: Report) -> None:
     print(f"dsutil report @ {report.timestamp_utc}")
@@ -12,14 +14,20 @@ def print_report(report: Report) -> None:
             break
         if i.severity == "warn":
             worst = "warn"
-    print(f"Issues: {len(report.issues)} (worst: {worst})\n")
+    print(f"Issues: {len(report.issues)} (worst: {worst})")
+    if report.root_cause:
+        print(f"Root cause: {' -> '.join(redact_text(c) for c in report.root_cause)}")
+    if report.not_run:
+        print(f"Not run: {', '.join(report.not_run)}")
+    print()
 
     print("Checks:")
     for c in report.checks:
         tag = "OK" if c.ok else "FAIL"
-        print(f"- [{tag}] {c.name}: {c.command}")
+        suffix = " (cached)" if c.cached else ""
+        print(f"- [{tag}] {c.name}: {redact_text(c.command)}{suffix}")
         if not c.ok and c.output:
-            txt = str(c.output)
+            txt = redact_text(str(c.output))
             print(f"  output: {txt[:400]}")
 
     print("\nIssues:")
@@ -27,5 +35,16 @@ def print_report(report: Report) -> None:
         print("- none ✅")
         return
     for i in report.issues:
-        print(f"- [{i.severity}] {i.title}")
-        print(f"  hint: {i.hint}")
+        print(f"- [{i.severity}] {redact_text(i.title)}")
+        print(f"  hint: {redact_text(i.hint)}")
+
+
+def print_fleet(table: FleetTable) -> None:
+    print(f"dsutil fleet: {len(table)} reports, {len(table.targets)} targets\n")
+    print("Checks:")
+    for name, counts in table.summary().items():
+        tag = "OK" if not counts["fail"] else "FAIL"
+        print(f"- [{tag}] {name}: ok {counts['ok']}, fail {counts['fail']}, not run {counts['not_run']}")
+        failing = sorted(set(table.failing(name)))
+        if failing:
+            print(f"  failing: {redact_text(', '.join(failing))}")
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    # never touch /var/lib/dsutil from tests
+    d = tmp_path / "state"
+    monkeypatch.setenv("DSUTIL_STATE_DIR", str(d))
+    return d
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+from typing import Callable
+
+from dsutil.backends.base import Backend, CmdResult
+
+NOT_FOUND = CmdResult(127, "", "not found")
+
+
+class FakeBackend(Backend):
+    """Scripted backend: exec answers come from (command prefix, result) pairs."""
+
+    def __init__(
+        self,
+        responses: dict[str, CmdResult | Callable[[str], CmdResult]] | None = None,
+        inspect: dict | None = None,
+        logs: str = "",
+    ) -> None:
+        self.responses = responses or {}
+        self.ins = inspect or {
+            "Id": "abc",
+            "State": {"Running": True, "Status": "running", "StartedAt": "t0", "Pid": 0},
+            "Config": {"Env": []},
+            "Mounts": [],
+        }
+        self._logs = logs
+        self.calls: list[str] = []
+
+    def check_available(self) -> tuple[bool, str]:
+        return True, "{}"
+
+    def exec(self, target: str, shell_cmd: str, timeout_s: int = 15) -> CmdResult:
+        self.calls.append(shell_cmd)
+        for prefix, res in self.responses.items():
+            if shell_cmd.startswith(prefix):
+                return res(shell_cmd) if callable(res) else res
+        return NOT_FOUND
+
+    def inspect(self, target: str) -> dict:
+        return json.loads(json.dumps(self.ins))
+
+    def logs(self, target: str, tail: int = 400) -> str:
+        return self._logs
@@ -0,0 +1,99 @@
+from fakes import FakeBackend
+
+from dsutil.backends.base import CmdResult
+from dsutil.collectors import linux_collect
+from dsutil.collectors.docker_collect import collect_docker_report
+from dsutil.core.cache import ResultCache
+
+
+def test_cached_reuses_until_key_changes():
+    cache = ResultCache()
+    calls = []
+    assert cache.cached("c", ["k1"], 60, lambda: calls.append(1) or "v") == ("v", False)
+    assert cache.cached("c", ["k1"], 60, lambda: calls.append(1) or "v") == ("v", True)
+    assert cache.cached("c", ["k2"], 60, lambda: calls.append(1) or "v") == ("v", False)
+    assert len(calls) == 2
+    cache.save()
+    assert ResultCache().get("c", ["k2"]) == "v"
+    assert ResultCache(enabled=False).get("c", ["k2"]) is None
+
+
+def test_cached_keep_rejects_transient_values():
+    cache = ResultCache()
+    assert cache.cached("c", [], 60, lambda: [124, ""], keep=lambda v: v[0] != 124) == ([124, ""], False)
+    assert cache.get("c", []) is None
+
+
+def _docker(nginx):
+    return FakeBackend({
+        "curl -fsS": CmdResult(0, "{}", ""),
+        "supervisorctl status": CmdResult(0, "ds:docservice RUNNING pid 1\nds:converter RUNNING pid 2", ""),
+        "out=$(nginx -t": nginx,
+    })
+
+
+def _nginx_check(report):
+    return next(c for c in report.checks if c.name == "nginx_test")
+
+
+_NGINX_OK = CmdResult(0, "nginx: configuration file /etc/nginx/nginx.conf test is successful\nnginx_rc=0\n", "")
+
+
+def test_docker_nginx_timeout_is_not_cached():
+    cache = ResultCache()
+    timeout = CmdResult(124, "", "Timeout running: docker exec")
+    assert not _nginx_check(collect_docker_report(_docker(timeout), "ds", samples=0, cache=cache)).ok
+    report = collect_docker_report(_docker(_NGINX_OK), "ds", samples=0, cache=cache)
+    check = _nginx_check(report)
+    assert check.ok and not check.cached
+    report = collect_docker_report(_docker(_NGINX_OK), "ds", samples=0, cache=cache)
+    assert _nginx_check(report).cached
+
+
+def test_docker_nginx_exec_failure_is_not_cached():
+    cache = ResultCache()
+    # docker exec itself fails with 1, the same status as an invalid config
+    restarting = CmdResult(1, "", "Error response from daemon: Container abc is restarting")
+    check = _nginx_check(collect_docker_report(_docker(restarting), "ds", samples=0, cache=cache))
+    assert not check.ok and "restarting" in check.output
+    check = _nginx_check(collect_docker_report(_docker(_NGINX_OK), "ds", samples=0, cache=cache))
+    assert check.ok and not check.cached
+
+
+def test_docker_nginx_invalid_config_uses_nginx_status():
+    cache = ResultCache()
+    invalid = CmdResult(0, 'nginx: [emerg] unknown directive "foo"\nnginx_rc=1\n', "")
+    report = collect_docker_report(_docker(invalid), "ds", samples=0, cache=cache)
+    check = _nginx_check(report)
+    assert not check.ok and check.output == 'nginx: [emerg] unknown directive "foo"'
+    assert any(i.title == "nginx -t failed" for i in report.issues)
+    # a completed test is cached even when the config is invalid
+    assert _nginx_check(collect_docker_report(_docker(_NGINX_OK), "ds", samples=0, cache=cache)).cached
+
+
+class _Host(linux_collect.LinuxBackend):
+    def __init__(self, nginx):
+        super().__init__(journalctl="/nonexistent/journalctl")
+        self.nginx = nginx
+
+    def check_available(self):
+        return True, "ok"
+
+    def exec(self, target, shell_cmd, timeout_s=15):
+        if shell_cmd.startswith("nginx -t"):
+            return self.nginx
+        if shell_cmd.startswith("systemctl"):
+            return CmdResult(0, "active", "")
+        return CmdResult(1, "", "")
+
+
+def test_linux_nginx_timeout_is_not_cached(monkeypatch):
+    monkeypatch.setattr(linux_collect, "_local_json_endpoints", lambda: {})
+    cache = ResultCache()
+    first = linux_collect.collect_linux_report(samples=0, backend=_Host(CmdResult(124, "", "timeout")), cache=cache)
+    assert not _nginx_check(first).ok
+    ok = CmdResult(0, "nginx: configuration file /etc/nginx/nginx.conf test is successful", "")
+    second = linux_collect.collect_linux_report(samples=0, backend=_Host(ok), cache=cache)
+    assert _nginx_check(second).ok and not _nginx_check(second).cached
+    third = linux_collect.collect_linux_report(samples=0, backend=_Host(ok), cache=cache)
+    assert _nginx_check(third).cached
@@ -0,0 +1,134 @@
+import json
+import time
+
+from dsutil import cli
+from dsutil.core.fleet import PREVIEW_CHARS, FleetTable
+from dsutil.core.models import CheckResult, Issue, Report, report_from_dict, report_to_dict
+from dsutil.core.rules import default_rules, scan_text
+
+
+def _report(target, transport="SocketTransport", ok=True, big=False):
+    r = Report("dsutil", "2026-10-19T00:00:00+00:00", "docker", target)
+    r.add_check(CheckResult("docker_available", True, "docker version", "{}"))
+    r.add_check(CheckResult("health_endpoint", ok, "curl http://localhost:8000/info/info.json", "x" * 1000 if big else "ok"))
+    r.add_check(CheckResult(
+        "supervisor_rpc", True, f"supervisor.getAllProcessInfo ({transport})",
+        {"ds:docservice": {"state": "RUNNING", "pid": 1, "log": "y" * (1000 if big else 1)}},
+    ))
+    r.add_check(CheckResult("nginx_test", True, "nginx -t", [0, "ok"], cached=True))
+    for i in scan_text("connect() failed (111: Connection refused)\n", default_rules()):
+        r.add_issue(i)
+    if not ok:
+        r.add_issue(Issue("crit", "Health endpoint failed", "Check DS."))
+    return r
+
+
+def test_round_trip_preserves_schema():
+    reports = [_report("a"), _report("b", "ExecTransport", ok=False)]
+    # a later report lists its checks in another order
+    reports[1].checks.reverse()
+    table = FleetTable()
+    for r in reports:
+        table.add(r)
+    assert table.to_dicts() == [report_to_dict(r) for r in reports]
+    assert table.summary()["health_endpoint"] == {"ok": 1, "fail": 1, "not_run": 0}
+    assert table.failing("health_endpoint") == ["b"]
+
+
+def test_large_outputs_reload_from_file(tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        p = tmp_path / f"{name}.json"
+        p.write_text(json.dumps(report_to_dict(_report(name, big=True))))
+        paths.append(p)
+    table = FleetTable()
+    for p in paths:
+        table.add_file(p)
+    views = [v for v in table.outputs.values() if v.truncated]
+    assert len(views) == 4 and all(len(v.preview) == PREVIEW_CHARS for v in views)
+    assert table.to_dicts() == [json.loads(p.read_text()) for p in paths]
+    preview = table.report(0, full_output=False)
+    assert preview.checks[1].output == "x" * PREVIEW_CHARS
+
+
+def test_held_outputs_are_stored_once():
+    r = _report("a", big=True)
+    table = FleetTable()
+    table.add(r)
+    v = table.outputs[(0, 2)]
+    # without a loader the value is held as is; the preview is derived from it on demand
+    assert not v.truncated and v.load() is r.checks[2].output
+    assert v.preview == json.dumps(r.checks[2].output)[:PREVIEW_CHARS]
+    assert v.size == len(json.dumps(r.checks[2].output))
+
+
+def test_merge_is_columnar_and_keeps_rows():
+    left, right = FleetTable(), FleetTable()
+    left.add(_report("a"))
+    extra = _report("c", "ExecTransport", ok=False)
+    extra.add_check(CheckResult("redis_ping", False, "redis-cli ping", "refused"))
+    right.add(extra)
+    right.add(_report("a"))
+    left.merge(right)
+    assert len(left) == 3
+    assert left.to_dicts() == [report_to_dict(r) for r in (_report("a"), extra, _report("a"))]
+    assert left.summary()["redis_ping"] == {"ok": 0, "fail": 1, "not_run": 2}
+    assert left.targets == ["a", "c"]
+
+
+def test_rule_issues_share_rule_strings():
+    table = FleetTable()
+    table.add(_report("a"))
+    table.add(_report("b"))
+    rule_keys = [k for k in table.issue_keys if k[3] == "conn_refused"]
+    assert len(rule_keys) == 1
+    # a same-titled issue with another hint stays distinct
+    r = _report("c")
+    r.add_issue(Issue("warn", rule_keys[0][1], "other hint"))
+    table.add(r)
+    assert table.to_dicts([2])[0]["issues"][-1]["hint"] == "other hint"
+
+
+def test_report_from_dict_round_trip():
+    r = _report("a")
+    assert report_to_dict(report_from_dict(report_to_dict(r))) == report_to_dict(r)
+
+
+def test_rebuild_cost_is_per_row():
+    table = FleetTable()
+    for i in range(2000):
+        r = _report(f"t{i}")
+        for j in range(20):
+            r.add_issue(Issue("warn", f"issue {j}", "hint"))
+        table.add(r)
+    t0 = time.perf_counter()
+    rows = table.to_dicts()
+    assert len(rows) == 2000 and len(rows[-1]["issues"]) == 20 + len(_report("x").issues)
+    assert time.perf_counter() - t0 < 2.0
+
+
+def test_fleet_cli(tmp_path, capsys):
+    for name, ok in (("a", True), ("b", False)):
+        (tmp_path / f"{name}.json").write_text(json.dumps(report_to_dict(_report(name, ok=ok))))
+    cli.fleet_main([str(tmp_path), "--json", "--reports"])
+    out = json.loads(capsys.readouterr().out)
+    assert out["reports"] == 2 and out["failing"] == {"health_endpoint": ["b"]}
+    assert [r["target"] for r in out["rows"]] == ["a", "b"]
+    cli.fleet_main([str(tmp_path / "a.json"), str(tmp_path / "missing.json")])
+    captured = capsys.readouterr()
+    assert "1 reports" in captured.out and "Skipping" in captured.err
+
+
+def test_triage_results_survive_round_trip_and_merge(tmp_path):
+    r = _report("b", ok=False)
+    r.not_run = ["dependencies", "logs"]
+    r.root_cause = ["state: Health endpoint failed", "services: Required service not RUNNING: ds:converter (FATAL)"]
+    p = tmp_path / "b.json"
+    p.write_text(json.dumps(report_to_dict(r)))
+    table, other = FleetTable(), FleetTable()
+    table.add(_report("a"))
+    other.add_file(p)
+    table.merge(other)
+    rows = table.to_dicts()
+    assert rows[0]["not_run"] == [] and rows[0]["root_cause"] == []
+    assert rows[1] == report_to_dict(r)
@@ -0,0 +1,146 @@
+import stat
+import sys
+
+import pytest
+
+from dsutil.backends.base import CmdResult
+from dsutil.backends.journal import JournalRead, read_journal
+from dsutil.backends.linux import LinuxBackend
+from dsutil.collectors import linux_collect
+from dsutil.core.state import load_state, save_state
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="journalctl stand-in is a shell script")
+
+# tail: two entries; --after-cursor: one (binary MESSAGE); a cursor starting with "bad" fails like a
+# vacuumed one, one starting with "noisy" warns about corrupted files (more than a pipe buffer) first
+_SCRIPT = """#!/bin/sh
+echo "$@" >> "{args}"
+case "$*" in
+  *--after-cursor\\ bad*) echo "Failed to seek to cursor" >&2; exit 1;;
+  *--after-cursor\\ noisy*)
+     i=0
+     while [ $i -lt 3000 ]; do
+       echo "Journal file /var/log/journal/x/system@0001.journal corrupted, ignoring file." >&2
+       i=$((i+1))
+     done
+     echo '{{"__CURSOR":"c4","__REALTIME_TIMESTAMP":"1700000180000000","_SYSTEMD_UNIT":"nginx.service","MESSAGE":"ok"}}';;
+  *--after-cursor*) echo '{{"__CURSOR":"c3","__REALTIME_TIMESTAMP":"1700000120000000","_SYSTEMD_UNIT":"ds-converter.service","MESSAGE":[69,77,70,73,76,69]}}';;
+  *) echo 'not json'
+     echo '{{"__CURSOR":"c1","__REALTIME_TIMESTAMP":"1700000000000000","_SYSTEMD_UNIT":"ds-docservice.service","MESSAGE":"upstream timed out"}}'
+     echo '{{"__CURSOR":"c2","__REALTIME_TIMESTAMP":"1700000060000000","_SYSTEMD_UNIT":"nginx.service","MESSAGE":"connect() failed (111: Connection refused)"}}';;
+esac
+"""
+
+
+@pytest.fixture
+def journalctl(tmp_path):
+    args = tmp_path / "args"
+    path = tmp_path / "journalctl"
+    path.write_text(_SCRIPT.format(args=args))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+    def calls():
+        return args.read_text().splitlines() if args.exists() else []
+
+    return str(path), calls
+
+
+def test_tail_read(journalctl):
+    path, calls = journalctl
+    r = read_journal(cursor=None, limit=50, journalctl=path)
+    assert r.rc == 0
+    assert [e.cursor for e in r.entries] == ["c1", "c2"]
+    assert r.entries[1].unit == "nginx.service"
+    assert r.entries[0].ts.year == 2023
+    assert r.cursor == "c2"
+    assert calls() == ["-o json --no-pager -q -u ds-* -u nginx.service -n 50"]
+
+
+def test_tail_keeps_newest(journalctl):
+    path, _ = journalctl
+    r = read_journal(limit=1, journalctl=path)
+    assert [e.cursor for e in r.entries] == ["c2"]
+    assert r.cursor == "c2"
+
+
+def test_after_cursor_and_binary_message(journalctl):
+    path, calls = journalctl
+    r = read_journal(cursor="c2", journalctl=path)
+    assert [(e.cursor, e.message) for e in r.entries] == [("c3", "EMFILE")]
+    assert calls()[-1].endswith("--after-cursor c2")
+
+
+def test_stale_cursor_and_missing_binary(journalctl, tmp_path):
+    path, _ = journalctl
+    r = read_journal(cursor="bad-1", journalctl=path)
+    assert r.rc == 1 and "seek" in r.err and r.cursor == "bad-1"
+    missing = read_journal(journalctl=str(tmp_path / "nope"))
+    assert missing.rc == 127 and not missing.entries
+
+
+def test_stderr_flood_does_not_block(journalctl):
+    path, _ = journalctl
+    r = read_journal(cursor="noisy-1", journalctl=path, timeout_s=5)
+    assert r.rc == 0 and [e.cursor for e in r.entries] == ["c4"]
+    assert r.err.count("corrupted") == 3000
+
+
+class _Host(LinuxBackend):
+    def check_available(self):
+        return True, "ok"
+
+    def exec(self, target, shell_cmd, timeout_s=15):
+        if shell_cmd.startswith("systemctl"):
+            return CmdResult(0, "active", "")
+        if shell_cmd.startswith("nginx"):
+            return CmdResult(0, "syntax is ok", "")
+        return CmdResult(1, "", "")
+
+
+def _journal_check(report):
+    return next(c for c in report.checks if c.name == "journal_scan")
+
+
+def test_collector_resumes_and_retries_stale_cursor(journalctl, monkeypatch):
+    path, calls = journalctl
+    monkeypatch.setattr(linux_collect, "_local_json_endpoints", lambda: {})
+    backend = _Host(journalctl=path)
+
+    first = linux_collect.collect_linux_report(samples=0, backend=backend)
+    assert _journal_check(first).output["resumed"] is False
+    assert load_state(linux_collect.JOURNAL_STATE) == {"cursor": "c2"}
+    assert any(i.rule == "conn_refused" for i in first.issues)
+
+    second = linux_collect.collect_linux_report(samples=0, backend=backend)
+    out = _journal_check(second).output
+    assert out["resumed"] is True and out["entries"] == 1
+    assert load_state(linux_collect.JOURNAL_STATE) == {"cursor": "c3"}
+
+    # journal vacuumed: the stored cursor fails, the collector starts over from the tail
+    save_state(linux_collect.JOURNAL_STATE, {"cursor": "bad-c3"})
+    third = linux_collect.collect_linux_report(samples=0, backend=backend)
+    check = _journal_check(third)
+    assert check.ok and check.output["resumed"] is False and check.output["entries"] == 2
+    assert calls()[-2:] == [
+        "-o json --no-pager -q -u ds-* -u nginx.service --after-cursor bad-c3",
+        "-o json --no-pager -q -u ds-* -u nginx.service -n 800",
+    ]
+    assert load_state(linux_collect.JOURNAL_STATE) == {"cursor": "c2"}
+
+
+def test_collector_does_not_retry_after_timeout(monkeypatch):
+    monkeypatch.setattr(linux_collect, "_local_json_endpoints", lambda: {})
+    save_state(linux_collect.JOURNAL_STATE, {"cursor": "c2"})
+    calls = []
+
+    class Slow(_Host):
+        def journal(self, cursor=None, tail=400):
+            calls.append(cursor)
+            return JournalRead([], cursor, 124, "Timeout running: journalctl")
+
+    report = linux_collect.collect_linux_report(samples=0, backend=Slow(journalctl="journalctl"))
+    check = _journal_check(report)
+    assert not check.ok and "Timeout" in check.output
+    # a timeout is not a stale cursor: no second read, and the cursor is kept
+    assert calls == ["c2"]
+    assert load_state(linux_collect.JOURNAL_STATE) == {"cursor": "c2"}
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dsutil import cli
+from dsutil.collectors.loadprobe import (
+    _percentile,
+    collect_loadprobe_report,
+    convert_once,
+    run_load,
+    sign_jwt,
+)
+
+SOURCE = "http://files.local/sample.docx"
+
+
+@pytest.fixture
+def convert_service():
+    """Stand-in ConvertService.ashx; `script` decides the reply per request."""
+    seen = []
+    script = {"delay": 0.0, "slots": None, "reply": lambda n: (200, {"endConvert": True, "fileUrl": "x"})}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                seen.append((body, self.headers))
+                n = len(seen)
+            slots = script["slots"]
+            if slots is not None:
+                slots.acquire()
+            try:
+                time.sleep(script["delay"])
+            finally:
+                if slots is not None:
+                    slots.release()
+            status, payload = script["reply"](n)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/ConvertService.ashx", script, seen
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile(values, 99) == 99
+    assert _percentile([], 50) is None
+
+
+def test_run_load_latency_and_throughput(convert_service):
+    url, script, seen = convert_service
+    script["delay"] = 0.02
+    stats = run_load(url, SOURCE, requests=8, concurrency=4)
+    assert stats["succeeded"] == 8 and stats["failed"] == 0
+    lat = stats["latency_ms"]
+    assert 20 <= lat["p50"] <= lat["p95"] <= lat["p99"] <= lat["max"]
+    assert stats["throughput_rps"] > 0
+    assert len({body["key"] for body, _ in seen}) == 8
+
+
+def test_jwt_in_body_and_header(convert_service):
+    url, _, seen = convert_service
+    _, err = convert_once(url, SOURCE, "docx", "pdf", 5, jwt_secret="s3cret", jwt_header="AuthorizationJwt")
+    assert err is None
+    body, headers = seen[0]
+    token = body.pop("token")
+    assert token == sign_jwt(body, "s3cret")
+    assert headers["AuthorizationJwt"] == "Bearer " + sign_jwt({"payload": body}, "s3cret")
+    assert body["url"] == SOURCE and body["outputtype"] == "pdf"
+
+
+def test_error_breakdown(convert_service):
+    url, script, _ = convert_service
+    replies = {1: (500, {}), 2: (200, {"error": -4}), 3: (200, {"endConvert": False})}
+    script["reply"] = lambda n: replies.get(n, (200, {"endConvert": True}))
+    stats = run_load(url, SOURCE, requests=5, concurrency=1)
+    assert stats["errors"] == {"http_500": 1, "convert_error_-4": 1, "not_finished": 1}
+    assert stats["succeeded"] == 2 and stats["error_rate"] == 0.6
+
+
+def test_connection_and_malformed_url_are_classified(convert_service):
+    assert convert_once("http://127.0.0.1:9/x", SOURCE, "docx", "pdf", 2)[1] == "connection"
+    assert convert_once("localhost/ConvertService.ashx", SOURCE, "docx", "pdf", 2)[1] == "invalid_url"
+    stats = run_load("localhost/ConvertService.ashx", SOURCE, requests=2, concurrency=2)
+    assert stats["errors"] == {"invalid_url": 2}
+
+
+def test_ramp_finds_saturation(convert_service):
+    url, script, _ = convert_service
+    # the stand-in converts at most two documents at a time
+    script["delay"], script["slots"] = 0.1, threading.Semaphore(2)
+    report = collect_loadprobe_report(url, SOURCE, requests=8, concurrency=8, ramp=True)
+    checks = {c.name: c for c in report.checks}
+    assert "convert_load_c1" in checks and "convert_load_c4" in checks
+    assert "convert_load_c8" not in checks
+    assert checks["convert_saturation"].output["saturation_concurrency"] == 2
+    assert any("saturates at concurrency 2" in i.title for i in report.issues)
+
+
+def test_cli_rejects_relative_url(capsys):
+    with pytest.raises(SystemExit):
+        cli.loadprobe_main(["--url", "localhost/ConvertService.ashx", "--source-url", SOURCE])
+    assert "absolute http(s) URL" in capsys.readouterr().err
@@ -0,0 +1,151 @@
+import sys
+
+import pytest
+
+from dsutil.backends.linux import LinuxBackend
+from dsutil.collectors import resources
+from dsutil.collectors.resources import (
+    CgroupSample,
+    ProcSample,
+    Sample,
+    Samples,
+    add_resource_checks,
+    parse_samples,
+    sample_container,
+    sample_local,
+    summarize,
+)
+from dsutil.core.models import Report
+
+MiB = 2**20
+
+
+def _stat(pid, comm, utime, stime):
+    return f"{pid} ({comm}) S 1 1 1 0 -1 4194560 0 0 0 0 {utime} {stime} 0 0 20 0 1 0 100\n"
+
+
+@pytest.fixture
+def fake_host(tmp_path, monkeypatch):
+    """/proc with docservice (2 fds, in /ds), nginx (no cgroup v2 line) and an unrelated bash."""
+    proc, cg = tmp_path / "proc", tmp_path / "cgroup"
+    (proc / "self").mkdir(parents=True)
+    (proc / "uptime").write_text("1234.50 999.00\n")
+    for pid, comm, cgroup, fds in ((10, "docservice", "0::/ds\n", 2), (20, "nginx", "1:name=systemd:/\n", 0),
+                                   (30, "bash", "0::/\n", 1)):
+        d = proc / str(pid)
+        (d / "fd").mkdir(parents=True)
+        for i in range(fds):
+            (d / "fd" / str(i)).touch()
+        (d / "comm").write_text(comm + "\n")
+        (d / "stat").write_text(_stat(pid, comm, 100, 50))
+        (d / "status").write_text(f"Name:\t{comm}\nVmRSS:\t  2048 kB\nThreads:\t4\n")
+        (d / "limits").write_text(
+            "Limit                     Soft Limit           Hard Limit           Units\n"
+            f"Max open files            {pid * 100}                 4096                 files\n"
+        )
+        (d / "cgroup").write_text(cgroup)
+    (cg / "ds").mkdir(parents=True)
+    (cg / "ds" / "memory.current").write_text(f"{256 * MiB}\n")
+    (cg / "ds" / "memory.max").write_text(f"{1024 * MiB}\n")
+    (cg / "ds" / "cpu.stat").write_text("usage_usec 5000000\nuser_usec 4000000\n")
+    monkeypatch.setattr(resources, "PROC_ROOT", str(proc))
+    monkeypatch.setattr(resources, "CGROUP_ROOT", str(cg))
+    return cg
+
+
+def test_parse_samples():
+    text = "\n".join([
+        "@K 250",
+        "@L 10 1024",
+        "@L 11 unlimited",
+        "@S 100.00",
+        "@P 10 docservice 2048 12 /ds",
+        "@T 10 " + _stat(10, "docservice", 100, 50).strip(),
+        "@P 11 nginx 512 3 -",
+        "@T 11 " + _stat(11, "nginx: (worker)", 7, 3).strip(),
+        "@C /ds 1048576 max 1000",
+        "@S 101.00",
+        "@C /ds - - -",
+    ])
+    s = parse_samples(text)
+    assert s.clk_tck == 250 and s.nofile == {10: 1024}
+    assert [x.uptime for x in s.samples] == [100.0, 101.0]
+    first = s.samples[0]
+    assert first.procs[10] == ProcSample("docservice", 150, 2048, 12, "/ds")
+    assert first.procs[11] == ProcSample("nginx", 10, 512, 3, None)
+    assert first.cgroups["/ds"] == CgroupSample(MiB, None, 1000)
+    assert s.samples[1].procs == {} and s.samples[1].cgroups["/ds"] == CgroupSample(None, None, None)
+
+
+def _samples(fds=(500, 850), mem=(512, 600), mem_max=1024 * MiB):
+    ss = Samples(100, nofile={1: 1000, 2: 4096})
+    for i, up in enumerate((10.0, 12.0)):
+        s = Sample(up)
+        # pid 1 uses 200 ticks (2 s of CPU at 100 Hz) over the 2 s window; pid 2 is idle
+        s.procs[1] = ProcSample("docservice", 100 + 200 * i, 1024 * (100 + i), fds[i], "/ds")
+        s.procs[2] = ProcSample("docservice", 50, 1024, 10, "/ds")
+        s.cgroups["/ds"] = CgroupSample(mem[i] * MiB, mem_max, 1_000_000 + 2_000_000 * i)
+        s.cgroups["/open"] = CgroupSample(MiB, None, None)
+        ss.samples.append(s)
+    return ss
+
+
+def test_summarize_cpu_fds_and_cgroup_limits():
+    out = summarize(_samples())
+    assert out["samples"] == 2 and out["window_s"] == 2.0
+    ds = out["programs"]["docservice"]
+    assert ds["processes"] == 2
+    assert ds["cpu_pct"] == {"mean": 100.0, "max": 100.0}
+    assert ds["rss_mb"] == {"mean": 101.5, "max": 102.0}
+    assert ds["fds"] == {"mean": 685.0, "max": 860.0}
+    # the busiest process is compared with its own limit, not the smallest limit of the program
+    assert ds["fd_limit"] == 1000 and ds["fd_usage_max"] == 0.85
+    cg = out["cgroups"]["/ds"]
+    assert cg["memory_mb"] == {"mean": 556.0, "max": 600.0}
+    assert cg["memory_limit_mb"] == 1024 and cg["memory_usage_max"] == 0.586
+    assert cg["cpu_pct"] == {"mean": 100.0, "max": 100.0}
+    # memory.max "max" means no limit
+    unlimited = out["cgroups"]["/open"]
+    assert unlimited["memory_limit_mb"] is None and unlimited["memory_usage_max"] is None
+    assert unlimited["cpu_pct"] is None
+
+
+def _titles(samples):
+    report = Report("dsutil", "t", "linux", "host")
+    add_resource_checks(report, samples, "sample")
+    return report, [i.title for i in report.issues]
+
+
+def test_resource_check_thresholds():
+    report, titles = _titles(_samples(fds=(500, 700), mem=(512, 900)))
+    assert report.checks[0].ok and titles == []
+    _, titles = _titles(_samples(fds=(500, 800), mem=(512, 930)))
+    assert titles == [
+        "File descriptor usage near limit: docservice (80%)",
+        "Memory usage near cgroup limit: /ds (91%)",
+    ]
+    report, titles = _titles(None)
+    assert not report.checks[0].ok and report.checks[0].output == "no samples" and titles == []
+
+
+def test_sample_local_reads_proc_and_cgroup(fake_host):
+    s = sample_local(2, interval_s=0)
+    assert s.nofile == {10: 1000, 20: 2000}
+    assert len(s.samples) == 2 and s.samples[0].uptime == 1234.5
+    procs = s.samples[0].procs
+    assert procs == {
+        10: ProcSample("docservice", 150, 2048, 2, "/ds"),
+        20: ProcSample("nginx", 150, 2048, 0, None),
+    }
+    assert s.samples[0].cgroups == {"/ds": CgroupSample(256 * MiB, 1024 * MiB, 5_000_000)}
+    (fake_host / "ds" / "memory.max").write_text("max\n")
+    assert sample_local(1).samples[0].cgroups["/ds"].mem_max is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="the sampler is a POSIX sh script")
+def test_container_sampler_matches_local(fake_host):
+    local = sample_local(2, interval_s=0)
+    remote, err = sample_container(LinuxBackend(), "host", 2, interval_s=0)
+    assert err == "" and remote is not None
+    assert remote.nofile == local.nofile
+    assert remote.samples == local.samples
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from dsutil.core.baseline import MIN_RUNS, BaselineStore
+from dsutil.core.rules import default_rules, scan_entries, scan_text, text_span_s
+
+
+def _ids(issues):
+    return {i.rule for i in issues}
+
+
+def test_span_of_ds_and_nginx_timestamps():
+    ds = "[2024-01-15T10:20:30.123] [ERROR] a\nno timestamp\n[2024-01-15T10:25:30.456] [WARN] b\n"
+    assert text_span_s(ds) == 300
+    nginx = "2024/01/15 10:20:30 [error] 1#1: a\n2024/01/15 10:22:30 [error] 1#1: b\n  continuation\n"
+    assert text_span_s(nginx) == 120
+    assert text_span_s("plain text\nmore text\n") is None
+
+
+def test_rates_need_threshold_without_timestamps():
+    # no timestamps: the excerpt counts as one minute of log
+    assert "timeout" not in _ids(scan_text("upstream timed out\n" * 4, default_rules()))
+    assert "timeout" in _ids(scan_text("upstream timed out\n" * 5, default_rules()))
+    # six hits spread over ten minutes stay below 5/min
+    lines = "".join(f"2024/01/15 10:{m:02d}:00 [error] upstream timed out\n" for m in range(0, 11, 2))
+    assert "timeout" not in _ids(scan_text(lines, default_rules()))
+
+
+def test_scan_entries_counts_hits_per_span():
+    t0 = datetime(2024, 1, 15, 10, 0)
+    entries = [(t0 + timedelta(seconds=10 * i), "502 Bad Gateway") for i in range(6)]
+    issues, hits = scan_entries(entries, default_rules())
+    assert "http_gateway" in _ids(issues)
+    assert hits["http_gateway"]["count"] == 6 and hits["http_gateway"]["last"] == "2024-01-15T10:00:50"
+    spread = [(t0 + timedelta(minutes=2 * i), "502 Bad Gateway") for i in range(6)]
+    assert "http_gateway" not in _ids(scan_entries(spread, default_rules())[0])
+
+
+def test_warm_up_fires_on_threshold_only():
+    store = BaselineStore()
+    # until MIN_RUNS observations exist, reaching the threshold is enough
+    assert [store.observe("t", "timeout", 10, 5) for _ in range(MIN_RUNS)] == [True] * MIN_RUNS
+    # afterwards 10/min is the normal level for this target
+    assert store.observe("t", "timeout", 10, 5) is False
+    assert store.observe("t", "timeout", 1, 5) is False
+
+
+def test_storm_stays_reported_while_it_lasts():
+    store = BaselineStore()
+    quiet = [store.observe("t", "http_gateway", 0.5, 5) for _ in range(10)]
+    storm = [store.observe("t", "http_gateway", 20, 5) for _ in range(10)]
+    recovered = [store.observe("t", "http_gateway", 0.5, 5) for _ in range(10)]
+    assert not any(quiet) and all(storm) and not any(recovered)
+    # the storm did not inflate the baseline: a smaller incident still deviates
+    assert store.observe("t", "http_gateway", 6, 5) is True
+
+
+def test_baseline_persists():
+    store = BaselineStore()
+    for _ in range(MIN_RUNS):
+        store.observe("t", "timeout", 1, 5)
+    store.save()
+    reloaded = BaselineStore()
+    assert reloaded.observe("t", "timeout", 20, 5) is True
+    assert reloaded.observed["t"]["timeout"]["baseline"] == 1
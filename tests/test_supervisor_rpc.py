@@ -0,0 +1,185 @@
+import socket
+import socketserver
+import threading
+import time
+import xmlrpc.client
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from fakes import FakeBackend
+
+from dsutil.backends.base import CmdResult
+from dsutil.collectors.docker_collect import collect_docker_report
+from dsutil.collectors.supervisor_rpc import (
+    RESTART_LOOP_MIN,
+    SocketTransport,
+    SupervisorRPCError,
+    probe_supervisor,
+    track_restarts,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs unix sockets")
+
+
+def _proc(group, name, state, start=0, stop=0, **kw):
+    now = int(time.time())
+    info = {
+        "group": group, "name": name, "statename": state, "start": start, "stop": stop, "now": now,
+        "pid": 42 if state == "RUNNING" else 0, "exitstatus": 0, "spawnerr": "", "description": "",
+    }
+    info.update(kw)
+    return info
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        req, _ = super().get_request()
+        return req, ("local", 0)
+
+
+@pytest.fixture
+def supervisord(tmp_path):
+    """Fake supervisord answering getAllProcessInfo on a unix socket."""
+    reply = {"result": [], "status": 200}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            _, method = xmlrpc.client.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            assert method == "supervisor.getAllProcessInfo"
+            if isinstance(reply["result"], xmlrpc.client.Fault):
+                out = xmlrpc.client.dumps(reply["result"], methodresponse=True)
+            else:
+                out = xmlrpc.client.dumps((reply["result"],), methodresponse=True)
+            data = out.encode("utf-8")
+            self.send_response(reply["status"])
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    path = str(tmp_path / "supervisor.sock")
+    srv = _Server(path, Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield path, reply
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_socket_transport_parses_process_info(supervisord):
+    path, reply = supervisord
+    now = int(time.time())
+    reply["result"] = [
+        _proc("ds", "docservice", "RUNNING", start=now - 100, stop=now - 200),
+        _proc("ds", "converter", "FATAL", stop=now - 5, exitstatus=1, spawnerr="Exited too quickly"),
+        _proc("nginx", "nginx", "RUNNING", start=now - 999),
+    ]
+    sup = probe_supervisor(SocketTransport(path), {"ds:docservice", "ds:converter"})
+    assert set(sup) == {"ds:docservice", "ds:converter"}
+    assert sup["ds:docservice"]["state"] == "RUNNING"
+    assert sup["ds:docservice"]["uptime_s"] >= 100
+    assert sup["ds:converter"]["spawnerr"] == "Exited too quickly"
+    # a single restart is not a loop
+    assert not sup["ds:docservice"]["restart_loop"]
+
+
+def test_fault_and_http_errors_raise(supervisord):
+    path, reply = supervisord
+    reply["result"] = xmlrpc.client.Fault(1, "UNKNOWN_METHOD")
+    with pytest.raises(SupervisorRPCError, match="fault 1"):
+        probe_supervisor(SocketTransport(path))
+    reply["result"], reply["status"] = [], 500
+    with pytest.raises(SupervisorRPCError, match="HTTP 500"):
+        probe_supervisor(SocketTransport(path))
+
+
+@pytest.fixture
+def garbled_socket(tmp_path):
+    """Something on supervisord's socket that does not speak HTTP."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.rfile.readline()
+            self.wfile.write(b"garbage\r\n\r\n")
+
+    path = str(tmp_path / "garbled.sock")
+    srv = _Server(path, Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield path
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_bad_status_line_raises(garbled_socket):
+    with pytest.raises(SupervisorRPCError, match="BadStatusLine"):
+        probe_supervisor(SocketTransport(garbled_socket, timeout_s=2))
+
+
+def test_collector_falls_back_on_bad_status_line(garbled_socket, monkeypatch):
+    monkeypatch.setattr(
+        "dsutil.collectors.docker_collect.container_transport", lambda *a: SocketTransport(garbled_socket)
+    )
+    backend = FakeBackend({
+        "curl -fsS": CmdResult(0, "{}", ""),
+        "supervisorctl status": CmdResult(0, "ds:docservice RUNNING pid 1\nds:converter RUNNING pid 2", ""),
+    })
+    report = collect_docker_report(backend, "ds", samples=0)
+    checks = {c.name: c for c in report.checks}
+    assert not checks["supervisor_rpc"].ok and checks["supervisorctl_status"].ok
+
+
+def test_missing_socket_raises(tmp_path):
+    with pytest.raises(SupervisorRPCError):
+        probe_supervisor(SocketTransport(str(tmp_path / "nope.sock"), timeout_s=1))
+
+
+def test_restart_loop_needs_repeated_starts_across_runs():
+    now = time.time()
+    for i in range(RESTART_LOOP_MIN):
+        sup = {"ds:docservice": {"state": "RUNNING", "start": int(now) - 300 + i * 60, "restart_loop": False}}
+        track_restarts(sup, "ds", now=now)
+        assert sup["ds:docservice"]["recent_starts"] == i + 1
+        assert sup["ds:docservice"]["restart_loop"] == (i + 1 >= RESTART_LOOP_MIN)
+    # same start seen again is not counted twice; other containers are independent
+    other = {"ds:docservice": {"state": "RUNNING", "start": int(now) - 300, "restart_loop": False}}
+    track_restarts(other, "other", now=now)
+    assert other["ds:docservice"]["recent_starts"] == 1
+
+
+def test_collector_falls_back_to_supervisorctl():
+    backend = FakeBackend({
+        "curl -fsS": CmdResult(0, '{"version":"8"}', ""),
+        "curl -sS --fail": CmdResult(7, "", "curl: (7) Couldn't connect to server"),
+        "supervisorctl status": CmdResult(
+            3, "ds:docservice RUNNING pid 1, uptime 1:00:00\nds:converter FATAL Exited too quickly", ""
+        ),
+    })
+    report = collect_docker_report(backend, "ds", samples=0)
+    checks = {c.name: c for c in report.checks}
+    assert not checks["supervisor_rpc"].ok
+    assert checks["supervisorctl_status"].ok
+    titles = [i.title for i in report.issues]
+    assert "Required service not RUNNING: ds:converter (FATAL)" in titles
+    assert not any("restarting repeatedly" in t for t in titles)
+
+
+def test_collector_uses_socket_transport(supervisord, monkeypatch):
+    path, reply = supervisord
+    now = int(time.time())
+    reply["result"] = [
+        _proc("ds", "docservice", "RUNNING", start=now - 30, stop=now - 35),
+        _proc("ds", "converter", "RUNNING", start=now - 500),
+    ]
+    monkeypatch.setattr(
+        "dsutil.collectors.docker_collect.container_transport", lambda *a: SocketTransport(path)
+    )
+    backend = FakeBackend({"curl -fsS": CmdResult(0, "{}", "")})
+    report = collect_docker_report(backend, "ds", samples=0)
+    rpc = next(c for c in report.checks if c.name == "supervisor_rpc")
+    assert rpc.ok and "SocketTransport" in rpc.command
+    # restarted once 30s ago: no restart-loop issue
+    assert not any("restarting repeatedly" in i.title for i in report.issues)
+    assert not any(c.startswith("supervisorctl") for c in backend.calls)
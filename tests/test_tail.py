@@ -0,0 +1,46 @@
+import pytest
+from fakes import FakeBackend
+
+from dsutil.backends.base import CmdResult
+from dsutil.collectors.docker_collect import DS_LOG_BASE, _read_ds_log
+from dsutil.core import tail
+from dsutil.core.tail import tail_bytes, tail_file
+
+
+@pytest.mark.parametrize("block", [7, 1 << 16])
+def test_tail_bytes(tmp_path, monkeypatch, block):
+    monkeypatch.setattr(tail, "_BLOCK", block)
+    p = tmp_path / "out.log"
+    p.write_bytes(b"".join(b"line %d\n" % i for i in range(100)))
+    assert tail_bytes(p, 3) == b"line 97\nline 98\nline 99"
+    assert tail_bytes(p, 500).count(b"\n") == 99
+    assert tail_bytes(p, 0) == b""
+
+
+def test_tail_file_missing_and_unreadable(tmp_path):
+    assert tail_file(tmp_path / "nope.log", 10) == (False, "")
+    # anything but a missing file is raised so callers can fall back
+    with pytest.raises(OSError):
+        tail_file(tmp_path, 10)
+
+
+def _ins(source):
+    return {"Mounts": [{"Source": str(source), "Destination": DS_LOG_BASE}]}
+
+
+def test_read_ds_log_through_mount(tmp_path):
+    (tmp_path / "docservice").mkdir()
+    (tmp_path / "docservice" / "out.log").write_text("a\nb\n")
+    backend = FakeBackend()
+    exists, content, via = _read_ds_log(backend, "ds", _ins(tmp_path), f"{DS_LOG_BASE}/docservice/out.log", 10)
+    assert (exists, content, via) == (True, "a\nb", "mount")
+    assert backend.calls == []
+    assert _read_ds_log(backend, "ds", _ins(tmp_path), f"{DS_LOG_BASE}/converter/out.log", 10)[:2] == (False, "")
+
+
+def test_read_ds_log_falls_back_to_exec_when_unreadable(tmp_path):
+    # a directory where the log should be: the mount exists but the file cannot be read
+    (tmp_path / "docservice" / "out.log").mkdir(parents=True)
+    backend = FakeBackend({"test -f": CmdResult(0, "from exec\n", "")})
+    exists, content, via = _read_ds_log(backend, "ds", _ins(tmp_path), f"{DS_LOG_BASE}/docservice/out.log", 10)
+    assert (exists, content, via) == (True, "from exec\n", "exec")
@@ -0,0 +1,43 @@
+from fakes import FakeBackend
+
+from dsutil.backends.base import CmdResult
+from dsutil.collectors.docker_collect import collect_docker_report
+from dsutil.core.triage import Triage
+
+_HEALTHY = {
+    "curl -fsS": CmdResult(0, "{}", ""),
+    "supervisorctl status": CmdResult(0, "ds:docservice RUNNING pid 1\nds:converter RUNNING pid 2", ""),
+    "out=$(nginx -t": CmdResult(0, "ok\nnginx_rc=0\n", ""),
+    "redis-cli": CmdResult(0, "PONG", ""),
+}
+
+
+def test_stops_at_tier_that_explains_the_failure():
+    backend = FakeBackend({
+        **_HEALTHY,
+        "curl -fsS": CmdResult(22, "", "502"),
+        "supervisorctl status": CmdResult(3, "ds:docservice RUNNING pid 1\nds:converter FATAL Exited too quickly", ""),
+    })
+    report = collect_docker_report(backend, "ds", samples=0, triage=Triage(enabled=True))
+    assert report.root_cause == [
+        "state: Health endpoint failed",
+        "services: Required service not RUNNING: ds:converter (FATAL)",
+    ]
+    assert report.not_run == ["dependencies", "logs"]
+    assert not any(c.startswith(("pg_isready", "rabbitmq-diagnostics", "redis-cli")) for c in backend.calls)
+
+
+def test_container_down_stops_in_first_tier():
+    backend = FakeBackend(_HEALTHY)
+    backend.ins["State"]["Running"] = False
+    report = collect_docker_report(backend, "ds", samples=0, triage=Triage(enabled=True))
+    assert report.root_cause == ["state: Container is not running"]
+    assert report.not_run == ["services", "dependencies", "logs"]
+
+
+def test_healthy_run_and_disabled_triage_run_everything():
+    for triage in (Triage(enabled=True), None):
+        backend = FakeBackend(_HEALTHY)
+        report = collect_docker_report(backend, "ds", samples=0, triage=triage)
+        assert report.not_run == [] and report.root_cause == []
+        assert any(c.name == "log_rates" for c in report.checks)